@@ -0,0 +1,4787 @@
+import os
+import sys
+import re
+import time
+import random
+import json
+import io
+import operator
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from collections import OrderedDict, namedtuple, deque
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
+from itertools import count, repeat
+from datetime import datetime
+
+__version__ = "0.2.3"
+
+# Python recursion limit while running a script; recursive EzScript
+# functions use several Python frames per call
+RECURSION_LIMIT = 10000
+RECURSION_MESSAGE = "Too much recursion: calls or values are nested too deeply"
+
+# Configure comment styles (you can change these!)
+COMMENT_STYLES = ['#']
+
+# A script's variables, window, timers and open files belong to the
+# EzInterpreter running it. Each thread runs one interpreter at a time, and
+# the builtins below find it here.
+_active = threading.local()
+
+def _current():
+    """The EzInterpreter running on this thread, else the default one."""
+    interpreter = getattr(_active, "interpreter", None)
+    return default_interpreter if interpreter is None else interpreter
+
+# With HEADLESS set, createWindow does nothing and tkinter, PIL and ctypes
+# are never imported; drawing calls still validate their arguments.
+HEADLESS = False
+
+# "tk" opens a real window; "pil" draws into an in-memory Pillow image that
+# saveFrame() writes out, for servers and CI without a display.
+BACKENDS = ("tk", "pil")
+BACKEND = os.environ.get("EZSCRIPT_BACKEND", "tk")
+
+# tkinter and PIL are imported on first use so text-only scripts start fast
+# and run on machines without Tk or Pillow.
+_tk_module = None
+_pil_modules = None
+
+def _import_tk():
+    global _tk_module
+    if _tk_module is None:
+        if HEADLESS:
+            raise EzScriptError("Windows are not available in headless mode")
+        try:
+            import tkinter
+        except ImportError as e:
+            raise EzScriptError(f"Window support needs tkinter: {e}")
+        _tk_module = tkinter
+    return _tk_module
+
+def _import_pil():
+    """Return (Image, ImageTk) from Pillow."""
+    global _pil_modules
+    if _pil_modules is None:
+        if HEADLESS:
+            raise EzScriptError("Images are not available in headless mode")
+        try:
+            from PIL import Image, ImageTk
+        except ImportError as e:
+            raise EzScriptError(f"Image support needs Pillow: {e}")
+        _pil_modules = (Image, ImageTk)
+    return _pil_modules
+
+# ast is needed only to compile scripts, check {placeholders} and analyze
+# parallel loops, so like tkinter and PIL it is imported on first use.
+# (argparse, csv, hashlib, marshal, mmap and pickle are imported inside the
+# functions that use them.)
+ast = None
+
+def _import_ast():
+    global ast
+    if ast is None:
+        import ast as module
+        ast = module
+
+def _import_pil_draw():
+    """Return (Image, ImageDraw, ImageFont) from Pillow, without tkinter."""
+    if HEADLESS:
+        raise EzScriptError("Images are not available in headless mode")
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError as e:
+        raise EzScriptError(f"The pil backend needs Pillow: {e}")
+    return Image, ImageDraw, ImageFont
+
+# ==========================
+# Off-screen (pil) backend
+# ==========================
+# OffscreenCanvas keeps the same items a Tk canvas would and paints them
+# into a Pillow image when a frame is saved, so moveObject/setColor and
+# friends work unchanged. OffscreenWindow runs after() timers back to back
+# instead of waiting for the wall clock, so animations render at full speed.
+
+def _pil_color(color):
+    if not color:
+        return None
+    try:
+        from PIL import ImageColor
+    except ImportError:
+        raise EzScriptError(f"Color names need Pillow; use \"#rrggbb\" instead of {color!r}")
+    try:
+        return ImageColor.getrgb(color.replace(" ", ""))
+    except ValueError:
+        raise EzScriptError(f"Unknown color: {color}")
+
+class OffscreenCanvas:
+    def __init__(self, width, height, bg):
+        self.width = int(width)
+        self.height = int(height)
+        self.bg = bg
+        self.items = {}
+        self._next_id = 1
+        self._fonts = {}
+
+    def _create(self, kind, coords, options):
+        item = self._next_id
+        self._next_id += 1
+        self.items[item] = [kind, [float(c) for c in coords], options]
+        return item
+
+    def create_oval(self, *coords, outline="black", fill=""):
+        return self._create("oval", coords, {"outline": outline, "fill": fill})
+
+    def create_rectangle(self, *coords, outline="black", fill=""):
+        return self._create("rectangle", coords, {"outline": outline, "fill": fill})
+
+    def create_line(self, *coords, fill="black", width=1):
+        return self._create("line", coords, {"fill": fill, "width": width})
+
+    def create_polygon(self, *coords, outline="black", fill=""):
+        return self._create("polygon", coords, {"outline": outline, "fill": fill})
+
+    def create_text(self, x, y, text="", fill="black", font=("Arial", 12)):
+        return self._create("text", (x, y), {"text": text, "fill": fill, "font": font})
+
+    def create_image(self, x, y, image=None, anchor="nw"):
+        return self._create("image", (x, y), {"image": image})
+
+    def coords(self, item, *coords):
+        if coords:
+            self.items[item][1] = [float(c) for c in coords]
+        return list(self.items[item][1])
+
+    def move(self, item, dx, dy):
+        coords = self.items[item][1]
+        for i in range(0, len(coords), 2):
+            coords[i] += dx
+            coords[i + 1] += dy
+
+    def itemconfigure(self, item, **options):
+        self.items[item][2].update(options)
+
+    def delete(self, item):
+        if item == "all":
+            self.items.clear()
+        else:
+            self.items.pop(item, None)
+
+    def config(self, bg=None):
+        if bg is not None:
+            self.bg = bg
+
+    def _font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            _, _, ImageFont = _import_pil_draw()
+            try:
+                font = ImageFont.truetype("arial.ttf", size)
+            except OSError:
+                font = ImageFont.load_default(size)
+            self._fonts[size] = font
+        return font
+
+    def render(self):
+        """Paint the current items into a new RGB image."""
+        Image, ImageDraw, _ = _import_pil_draw()
+        img = Image.new("RGB", (self.width, self.height), _pil_color(self.bg))
+        draw = ImageDraw.Draw(img)
+        for kind, coords, opts in self.items.values():
+            if kind == "oval" or kind == "rectangle":
+                x1, y1, x2, y2 = coords
+                box = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+                shape = draw.ellipse if kind == "oval" else draw.rectangle
+                shape(box, outline=_pil_color(opts["outline"]), fill=_pil_color(opts["fill"]))
+            elif kind == "line":
+                draw.line(coords, fill=_pil_color(opts["fill"]), width=int(opts["width"]))
+            elif kind == "polygon":
+                draw.polygon(coords, outline=_pil_color(opts["outline"]), fill=_pil_color(opts["fill"]))
+            elif kind == "text":
+                draw.text(coords, str(opts["text"]), fill=_pil_color(opts["fill"]),
+                          font=self._font(int(opts["font"][1])), anchor="mm")
+            elif kind == "image":
+                image = opts["image"]
+                mask = image if image.mode == "RGBA" else None
+                img.paste(image, (int(coords[0]), int(coords[1])), mask)
+        return img
+
+class OffscreenWindow:
+    """The parts of tkinter.Tk that the window builtins use."""
+
+    def __init__(self, canvas, title):
+        self.canvas = canvas
+        self.name = title
+        self._timers = []
+        self._next_id = 1
+        self._running = False
+
+    def title(self, title):
+        self.name = title
+
+    def geometry(self, size):
+        width, height = size.split("x")
+        self.canvas.width, self.canvas.height = int(float(width)), int(float(height))
+
+    def after(self, ms, callback):
+        timer_id = self._next_id
+        self._next_id += 1
+        self._timers.append((time.perf_counter() + ms / 1000, timer_id, callback))
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        self._timers = [t for t in self._timers if t[1] != timer_id]
+
+    def _run_next(self):
+        timer = min(self._timers)
+        self._timers.remove(timer)
+        timer[2]()
+
+    def update(self):
+        now = time.perf_counter()
+        while self._timers and min(self._timers)[0] <= now:
+            self._run_next()
+
+    def mainloop(self):
+        # Runs until no timer is left or quit()/destroy() is called
+        self._running = True
+        while self._running and self._timers:
+            self._run_next()
+        self._running = False
+
+    def quit(self):
+        self._running = False
+
+    def destroy(self):
+        self._timers.clear()
+        self._running = False
+
+    def bind(self, sequence, handler):
+        pass
+
+
+def _set_default_icon():
+    ez = _current()
+    if ez.window:
+        try:
+            script_dir = Path(__file__).parent
+            default_icon = script_dir / "icon.ico"
+            if default_icon.exists():
+                ez.window.iconbitmap(str(default_icon))
+        except:
+            pass
+
+# Windows-only: disable maximize button
+def _disable_maximize():
+    ez = _current()
+    if sys.platform.startswith("win"):
+        import ctypes
+        hwnd = ctypes.windll.user32.GetParent(ez.window.winfo_id())
+        GWL_STYLE = -16
+        WS_MAXIMIZEBOX = 0x00010000
+        style = ctypes.windll.user32.GetWindowLongW(hwnd, GWL_STYLE)
+        style = style & ~WS_MAXIMIZEBOX
+        ctypes.windll.user32.SetWindowLongW(hwnd, GWL_STYLE, style)
+        ctypes.windll.user32.SetWindowPos(
+            hwnd, 0, 0, 0, 0, 0,
+            0x0002 | 0x0001 | 0x0020  # SWP_NOMOVE | SWP_NOSIZE | SWP_FRAMECHANGED
+        )
+
+def _create_window(width, height, title,
+                   resizable=False, always_on_top=False, can_maximize=True):
+    if HEADLESS:
+        return None
+    ez = _current()
+    ez.window_objects = {}
+    ez.canvas_images = {}
+    # Cached images belong to the previous Tk root or backend
+    ez.image_cache.clear()
+    if BACKEND == "pil":
+        ez.canvas = OffscreenCanvas(width, height, "white")
+        ez.window = OffscreenWindow(ez.canvas, title)
+        return None
+    tk = _import_tk()
+    ez.window = tk.Tk()
+    ez.window.title(title)
+    ez.canvas = tk.Canvas(ez.window, width=width, height=height, bg="white")
+    ez.canvas.pack()
+
+    # Window properties
+    ez.window.resizable(resizable, resizable)
+    ez.window.attributes("-topmost", always_on_top)
+
+    # Set default icon
+    _set_default_icon()
+
+    # Disable maximize button if needed (Windows only)
+    if not can_maximize:
+        ez.window.after_idle(_disable_maximize)
+
+
+def _set_window_title(title):
+    ez = _current()
+    if ez.window:
+        ez.window.title(title)
+    return title
+
+def _set_window_size(width, height):
+    ez = _current()
+    if ez.window:
+        ez.window.geometry(f"{width}x{height}")
+    return f"{width}x{height}"
+
+def _set_background(color):
+    ez = _current()
+    if ez.canvas:
+        ez.canvas.config(bg=color)
+    return color
+
+def _draw_circle(x, y, radius, color, fill):
+    ez = _current()
+    if ez.canvas:
+        obj = ez.canvas.create_oval(x-radius, y-radius, x+radius, y+radius, 
+                                 outline=color, fill=fill if fill else "")
+        ez.window_objects[obj] = "circle"
+        return obj
+    return None
+
+def _draw_rectangle(x1, y1, x2, y2, color, fill):
+    ez = _current()
+    if ez.canvas:
+        obj = ez.canvas.create_rectangle(x1, y1, x2, y2, 
+                                       outline=color, fill=fill if fill else "")
+        ez.window_objects[obj] = "rectangle"
+        return obj
+    return None
+
+def _draw_line(x1, y1, x2, y2, color, width):
+    ez = _current()
+    if ez.canvas:
+        obj = ez.canvas.create_line(x1, y1, x2, y2, fill=color, width=width)
+        ez.window_objects[obj] = "line"
+        return obj
+    return None
+
+def _draw_text(x, y, text, color, font_size):
+    ez = _current()
+    if ez.canvas:
+        obj = ez.canvas.create_text(x, y, text=text, fill=color, 
+                                 font=("Arial", font_size))
+        ez.window_objects[obj] = "text"
+        return obj
+    return None
+
+# Batch drawing: one validated list in, one Tcl round trip out
+
+_TCL_SPECIAL = re.compile(r'[{}\[\]$\\"]')
+
+def _tcl_word(value):
+    text = str(value)
+    if _TCL_SPECIAL.search(text):
+        raise EzScriptError(f"Invalid color: {text}")
+    return "{" + text + "}"
+
+def _create_items(kind, rows, options):
+    """Create one canvas item per coordinate row and return their ids.
+
+    On Tk every create command goes into a single Tcl script, so ten
+    thousand shapes cost one call into Tcl instead of ten thousand.
+    """
+    ez = _current()
+    if isinstance(ez.canvas, OffscreenCanvas):
+        create = getattr(ez.canvas, "create_" + kind)
+        return [create(*row, **options) for row in rows]
+    if not rows:
+        return []
+    opts = " ".join(f"-{name} {_tcl_word(value)}" for name, value in options.items())
+    prefix = f"[{ez.canvas} create {kind} "
+    suffix = f" {opts}]"
+    script = "list " + " ".join(prefix + " ".join(map(repr, row)) + suffix for row in rows)
+    return [int(item) for item in ez.canvas.tk.splitlist(ez.canvas.tk.eval(script))]
+
+def _draw_points(points, color, size):
+    ez = _current()
+    if ez.canvas:
+        half = size / 2
+        rows = [(x - half, y - half, x + half, y + half) for x, y in points]
+        items = _create_items("rectangle", rows, {"outline": "", "fill": color})
+        ez.window_objects.update(dict.fromkeys(items, "rectangle"))
+        return items
+    return None
+
+def _draw_circles(circles, color, fill):
+    ez = _current()
+    if ez.canvas:
+        rows = [(x - r, y - r, x + r, y + r) for x, y, r in circles]
+        items = _create_items("oval", rows, {"outline": color, "fill": fill or ""})
+        ez.window_objects.update(dict.fromkeys(items, "circle"))
+        return items
+    return None
+
+def _draw_rectangles(rectangles, color, fill):
+    ez = _current()
+    if ez.canvas:
+        items = _create_items("rectangle", rectangles, {"outline": color, "fill": fill or ""})
+        ez.window_objects.update(dict.fromkeys(items, "rectangle"))
+        return items
+    return None
+
+def _draw_polyline(points, color, width):
+    ez = _current()
+    if ez.canvas:
+        flat = [v for point in points for v in point]
+        obj = ez.canvas.create_line(*flat, fill=color, width=width)
+        ez.window_objects[obj] = "line"
+        return obj
+    return None
+
+def _draw_polygon(points, color, fill):
+    ez = _current()
+    if ez.canvas:
+        flat = [v for point in points for v in point]
+        obj = ez.canvas.create_polygon(*flat, outline=color, fill=fill or "")
+        ez.window_objects[obj] = "polygon"
+        return obj
+    return None
+
+def _cached_photo(path, width, height):
+    """Return a PhotoImage for the file, decoding it only on a cache miss."""
+    ez = _current()
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns, width, height)
+    photo = ez.image_cache.get(key)
+    if photo is None:
+        offscreen = isinstance(ez.canvas, OffscreenCanvas)
+        if offscreen:
+            Image, _, _ = _import_pil_draw()
+        else:
+            Image, ImageTk = _import_pil()
+        with Image.open(path) as img:
+            if width is not None and height is not None:
+                img = img.resize((width, height), Image.LANCZOS)
+            size = img.width * img.height * 4
+            photo = img.convert("RGBA") if offscreen else ImageTk.PhotoImage(img)
+        ez.image_cache.put(key, photo, size)
+    return photo
+
+def _load_image(path, x, y, width=None, height=None):
+    ez = _current()
+    if ez.canvas:
+        try:
+            photo = _cached_photo(path, width, height)
+            obj = ez.canvas.create_image(x, y, image=photo, anchor="nw")
+        except Exception as e:
+            raise EzScriptError(f"Cannot load image: {e}")
+        ez.canvas_images[obj] = photo
+        ez.window_objects[obj] = "image"
+        return obj
+    return None
+
+def _set_image_cache_size(megabytes):
+    _current().image_cache.resize(maxcost=int(megabytes * 1024 * 1024))
+    return megabytes
+
+def _clear_window():
+    ez = _current()
+    if ez.canvas:
+        ez.canvas.delete("all")
+        ez.window_objects.clear()
+        ez.canvas_images.clear()
+    return "Cleared"
+
+# Drawn objects stay on the canvas; these change them in place so an
+# animation can update what moved instead of clearing and redrawing.
+
+def _object_kind(name, handle):
+    ez = _current()
+    kind = ez.window_objects.get(handle) if isinstance(handle, int) else None
+    if kind is None:
+        raise EzScriptError(f"{name}: unknown or deleted object")
+    return kind
+
+def _move_object(handle, dx, dy):
+    ez = _current()
+    if ez.canvas:
+        _object_kind("moveObject", handle)
+        ez.canvas.move(handle, dx, dy)
+    return handle
+
+def _set_position(handle, x, y):
+    ez = _current()
+    if ez.canvas:
+        kind = _object_kind("setPosition", handle)
+        coords = ez.canvas.coords(handle)
+        if kind == "circle":
+            # Circles are positioned by their center, like drawCircle
+            cx, cy = (coords[0] + coords[2]) / 2, (coords[1] + coords[3]) / 2
+        else:
+            cx, cy = coords[0], coords[1]
+        ez.canvas.move(handle, x - cx, y - cy)
+    return handle
+
+def _set_color(handle, color, fill):
+    ez = _current()
+    if ez.canvas:
+        kind = _object_kind("setColor", handle)
+        if kind in ("circle", "rectangle", "polygon"):
+            if fill is None:
+                ez.canvas.itemconfigure(handle, outline=color)
+            else:
+                ez.canvas.itemconfigure(handle, outline=color, fill=fill)
+        elif kind in ("line", "text"):
+            ez.canvas.itemconfigure(handle, fill=color)
+        else:
+            raise EzScriptError("setColor: images have no color")
+    return handle
+
+def _set_text(handle, text):
+    ez = _current()
+    if ez.canvas:
+        if _object_kind("setText", handle) != "text":
+            raise EzScriptError("setText: object is not text")
+        ez.canvas.itemconfigure(handle, text=text)
+    return handle
+
+def _delete_object(handle):
+    ez = _current()
+    if ez.canvas:
+        _object_kind("deleteObject", handle)
+        ez.canvas.delete(handle)
+        del ez.window_objects[handle]
+        ez.canvas_images.pop(handle, None)
+    return "Deleted"
+
+def _raise_timer_error(ez):
+    """Re-raise the error that stopped a timer callback, if any."""
+    if ez.timer_error is not None:
+        error, ez.timer_error = ez.timer_error, None
+        raise error
+
+def _update_window():
+    ez = _current()
+    if ez.window:
+        ez.window.update()
+        _raise_timer_error(ez)
+    return "Updated"
+
+def _show_window():
+    ez = _current()
+    if ez.window:
+        ez.window.mainloop()
+        _raise_timer_error(ez)
+    return "Window shown"
+
+def _close_window():
+    ez = _current()
+    if ez.window:
+        _cancel_timers(ez)
+        ez.window.destroy()
+    return "Window closed"
+# ==========================
+# Pixel buffers
+# ==========================
+# A PixelBuffer is a packed RGB bytearray; blit() pushes it to the canvas
+# as one image, reusing the same PhotoImage and canvas item every frame.
+
+class PixelBuffer:
+    __slots__ = ("width", "height", "data", "photo", "item", "canvas")
+
+    def __init__(self, width, height, rgb):
+        self.width = width
+        self.height = height
+        self.data = bytearray(rgb) * (width * height)
+        self.photo = None
+        self.item = None
+        self.canvas = None
+
+    def __repr__(self):
+        return f"<pixel buffer {self.width}x{self.height}>"
+
+_rgb_cache = {}
+
+# Color names pixel buffers know without Pillow, with Pillow's values
+_BASIC_COLORS = {
+    'black': '000000', 'white': 'ffffff', 'red': 'ff0000', 'lime': '00ff00',
+    'green': '008000', 'blue': '0000ff', 'yellow': 'ffff00', 'cyan': '00ffff',
+    'aqua': '00ffff', 'magenta': 'ff00ff', 'fuchsia': 'ff00ff', 'gray': '808080',
+    'grey': '808080', 'silver': 'c0c0c0', 'maroon': '800000', 'olive': '808000',
+    'navy': '000080', 'purple': '800080', 'teal': '008080', 'orange': 'ffa500',
+    'pink': 'ffc0cb', 'brown': 'a52a2a', 'gold': 'ffd700',
+}
+
+def _rgb(name, color):
+    """Return color as 3 bytes; accepts names, "#rrggbb" or (r, g, b)."""
+    if isinstance(color, str):
+        rgb = _rgb_cache.get(color)
+        if rgb is None:
+            basic = _BASIC_COLORS.get(color.replace(" ", "").lower())
+            if re.fullmatch(r"#[0-9a-fA-F]{6}", color):
+                rgb = bytes.fromhex(color[1:])
+            elif basic is not None:
+                rgb = bytes.fromhex(basic)
+            elif HEADLESS:
+                raise EzScriptError(f"{name}: unknown color {color!r}; headless mode knows only basic "
+                                    "color names, so use \"#rrggbb\" or (r, g, b)")
+            else:
+                # Other names come from Pillow's color table
+                rgb = bytes(_pil_color(color)[:3])
+            _rgb_cache[color] = rgb
+        return rgb
+    if (isinstance(color, (list, tuple)) and len(color) == 3
+            and all(isinstance(v, int) and 0 <= v <= 255 for v in color)):
+        return bytes(color)
+    raise EzScriptError(f"{name}: color must be a name, \"#rrggbb\" or (r, g, b) with values 0-255")
+
+def _create_pixel_buffer(width, height, color):
+    return PixelBuffer(width, height, _rgb("createPixelBuffer", color))
+
+def _set_pixel(buf, x, y, rgb):
+    if not (0 <= x < buf.width and 0 <= y < buf.height):
+        raise EzScriptError(f"setPixel: ({x}, {y}) is outside the {buf.width}x{buf.height} buffer")
+    i = (y * buf.width + x) * 3
+    buf.data[i:i + 3] = rgb
+
+def _fill_pixels(buf, rgb, x, y, width, height):
+    # Clip the rectangle to the buffer, then fill it one row slice at a time
+    x1, y1 = max(x, 0), max(y, 0)
+    x2, y2 = min(x + width, buf.width), min(y + height, buf.height)
+    if x1 >= x2 or y1 >= y2:
+        return buf
+    row = rgb * (x2 - x1)
+    data, stride = buf.data, buf.width * 3
+    for start in range(y1 * stride + x1 * 3, y2 * stride, stride):
+        data[start:start + len(row)] = row
+    return buf
+
+def _blit(buf, x, y):
+    ez = _current()
+    if ez.canvas:
+        size = (buf.width, buf.height)
+        fresh = buf.canvas is not ez.canvas
+        if isinstance(ez.canvas, OffscreenCanvas):
+            Image, _, _ = _import_pil_draw()
+            # Copy, so later setPixel calls don't change a frame already shown
+            buf.photo = Image.frombytes("RGB", size, bytes(buf.data))
+            if not fresh and buf.item in ez.window_objects:
+                ez.canvas.itemconfigure(buf.item, image=buf.photo)
+        else:
+            Image, ImageTk = _import_pil()
+            img = Image.frombuffer("RGB", size, buf.data, "raw", "RGB", 0, 1)
+            if fresh:
+                buf.photo = ImageTk.PhotoImage(img)
+            else:
+                buf.photo.paste(img)
+        buf.canvas = ez.canvas
+        if fresh or buf.item not in ez.window_objects:
+            buf.item = ez.canvas.create_image(x, y, image=buf.photo, anchor="nw")
+            ez.window_objects[buf.item] = "image"
+        else:
+            ez.canvas.coords(buf.item, x, y)
+        ez.canvas_images[buf.item] = buf.photo
+        return buf.item
+    return None
+
+def _save_frame(path):
+    ez = _current()
+    if ez.canvas:
+        if not isinstance(ez.canvas, OffscreenCanvas):
+            raise EzScriptError("saveFrame needs the pil backend (--backend pil)")
+        try:
+            ez.canvas.render().save(path)
+        except (OSError, ValueError) as e:
+            raise EzScriptError(f"Cannot save frame: {e}")
+    return path
+
+def _set_window_icon(icon_path):
+    ez = _current()
+    if isinstance(ez.window, OffscreenWindow):
+        return "Icon set"
+    if ez.window:
+        try:
+            # Try .ico format first
+            if icon_path.endswith('.ico'):
+                ez.window.iconbitmap(icon_path)
+            else:
+                # For PNG, JPG, etc.
+                Image, ImageTk = _import_pil()
+                img = Image.open(icon_path)
+                photo = ImageTk.PhotoImage(img)
+                ez.window.iconphoto(True, photo)
+                # Keep reference to prevent garbage collection
+                if not hasattr(ez.window, 'icon_image'):
+                    ez.window.icon_image = photo
+                else:
+                    ez.window.icon_image = photo
+            return "Icon set"
+        except Exception as e:
+            raise EzScriptError(f"Cannot set icon: {e}")
+    return None
+
+def _remove_window_icon():
+    ez = _current()
+    if ez.window and not isinstance(ez.window, OffscreenWindow):
+        try:
+            # Set to blank/default icon
+            ez.window.iconbitmap('')
+            return "Icon removed"
+        except:
+            pass
+    return None
+
+# ==========================
+# Frame scheduler
+# ==========================
+# onFrame/every callbacks run from the Tk event loop via window.after, so
+# they fire during showWindow() (and updateWindow()) without blocking input.
+
+class _Timer:
+    """Calls a function every `period` seconds on a fixed timestep.
+
+    Deadlines advance by whole periods from the start time, so pacing does
+    not drift with callback duration. When a callback runs late by more than
+    a period, the missed ticks are skipped instead of run back to back.
+    """
+
+    def __init__(self, owner, timer_id, callback, period):
+        self.owner = owner
+        self.id = timer_id
+        self.callback = callback
+        self.period = period
+        self.next_time = time.perf_counter() + period
+        self.after_id = None
+        self.frames = 0
+        self.skipped = 0
+        self.busy_total = 0.0
+        self.busy_max = 0.0
+        self.ticks = deque(maxlen=120)
+
+    def schedule(self):
+        delay = max(0, int((self.next_time - time.perf_counter()) * 1000))
+        self.after_id = self.owner.window.after(delay, self._tick)
+
+    def cancel(self):
+        if self.after_id is not None:
+            try:
+                self.owner.window.after_cancel(self.after_id)
+            except Exception:
+                pass
+            self.after_id = None
+
+    def _tick(self):
+        owner = self.owner
+        self.after_id = None
+        now = time.perf_counter()
+        late = now - self.next_time
+        if late >= self.period:
+            missed = int(late // self.period)
+            self.skipped += missed
+            self.next_time += missed * self.period
+        self.next_time += self.period
+        self.ticks.append(now)
+        try:
+            self.callback()
+        except Exception as e:
+            # Stop the event loop; showWindow() or updateWindow() re-raises the error
+            owner.timer_error = e
+            _cancel_timers(owner)
+            owner.window.quit()
+            return
+        busy = time.perf_counter() - now
+        self.frames += 1
+        self.busy_total += busy
+        self.busy_max = max(self.busy_max, busy)
+        if self.id in owner.timers:
+            self.schedule()
+
+    def stats(self):
+        ticks = self.ticks
+        span = ticks[-1] - ticks[0] if len(ticks) > 1 else 0
+        return {
+            'fps': round((len(ticks) - 1) / span, 2) if span else 0.0,
+            'targetFps': round(1 / self.period, 2),
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'frameTime': round(self.busy_total / self.frames * 1000, 3) if self.frames else 0.0,
+            'maxFrameTime': round(self.busy_max * 1000, 3),
+        }
+
+def _start_timer(callback, period):
+    ez = _current()
+    if not ez.window:
+        return None
+    timer = _Timer(ez, ez.next_timer_id, callback, period)
+    ez.next_timer_id += 1
+    ez.timers[timer.id] = timer
+    timer.schedule()
+    return timer.id
+
+def _on_frame(callback, fps):
+    ez = _current()
+    if ez.frame_timer is not None:
+        _cancel_timer(ez.frame_timer)
+    ez.frame_timer = _start_timer(callback, 1 / fps)
+    return ez.frame_timer
+
+def _every(ms, callback):
+    return _start_timer(callback, ms / 1000)
+
+def _cancel_timer(timer_id):
+    ez = _current()
+    timer = ez.timers.pop(timer_id, None)
+    if timer is not None:
+        timer.cancel()
+    if timer_id == ez.frame_timer:
+        ez.frame_timer = None
+    return "Cancelled"
+
+def _cancel_timers(ez):
+    for timer in ez.timers.values():
+        timer.cancel()
+    ez.timers.clear()
+    ez.frame_timer = None
+
+def _frame_stats(timer_id):
+    ez = _current()
+    if timer_id is None:
+        timer_id = ez.frame_timer
+    timer = ez.timers.get(timer_id)
+    if timer is None:
+        return {'fps': 0.0, 'targetFps': 0.0, 'frames': 0, 'skipped': 0,
+                'frameTime': 0.0, 'maxFrameTime': 0.0}
+    return timer.stats()
+
+# ==========================
+# API wrappers for EzScript
+# ==========================
+
+def _api_onKeyDown(*args):
+    if len(args) != 2:
+        raise EzScriptError("onKeyDown(key, callback) expects 2 arguments")
+    key, callback = args
+    if not isinstance(key, str):
+        raise EzScriptError("onKeyDown: key must be a string")
+    if not callable(callback):
+        raise EzScriptError("onKeyDown: callback must be a function")
+    ez = _current()
+
+    def handler(event):
+        ez.key_states[key] = True
+        callback()
+
+    if ez.window:
+        ez.window.bind(f"<KeyPress-{key}>", lambda e: handler(e))
+    return "Callback registered"
+
+def _api_onKeyUp(*args):
+    if len(args) != 2:
+        raise EzScriptError("onKeyUp(key, callback) expects 2 arguments")
+    key, callback = args
+    if not isinstance(key, str):
+        raise EzScriptError("onKeyUp: key must be a string")
+    if not callable(callback):
+        raise EzScriptError("onKeyUp: callback must be a function")
+    ez = _current()
+
+    def handler(event):
+        ez.key_states[key] = False
+        callback()
+
+    if ez.window:
+        ez.window.bind(f"<KeyRelease-{key}>", lambda e: handler(e))
+    return "Callback registered"
+
+def _api_createWindow(*args):
+    if len(args) < 3 or len(args) > 6:
+        raise EzScriptError("createWindow(width, height, title, resizable?, alwaysOnTop?, canMaximize?) expects 3–6 arguments")
+
+    width, height, title = args[0], args[1], args[2]
+    resizable = args[3] if len(args) >= 4 else False
+    always_on_top = args[4] if len(args) >= 5 else False
+    can_maximize = args[5] if len(args) == 6 else False
+
+    if not isinstance(width, (int, float)) or not isinstance(height, (int, float)):
+        raise EzScriptError("createWindow: width and height must be numbers")
+    if not isinstance(title, str):
+        raise EzScriptError("createWindow: title must be a string")
+    if not isinstance(resizable, bool):
+        raise EzScriptError("createWindow: resizable must be true or false")
+    if not isinstance(always_on_top, bool):
+        raise EzScriptError("createWindow: alwaysOnTop must be true or false")
+    if not isinstance(can_maximize, bool):
+        raise EzScriptError("createWindow: canMaximize must be true or false")
+
+    return _create_window(width, height, title, resizable, always_on_top, can_maximize)
+
+
+
+def _api_setWindowTitle(*args):
+    if len(args) != 1:
+        raise EzScriptError("setWindowTitle(title) expects 1 argument")
+    if not isinstance(args[0], str):
+        raise EzScriptError("setWindowTitle: title must be a string")
+    return _set_window_title(args[0])
+
+
+def _api_setWindowSize(*args):
+    if len(args) != 2:
+        raise EzScriptError("setWindowSize(width, height) expects 2 arguments")
+    width, height = args
+    if not isinstance(width, (int, float)) or not isinstance(height, (int, float)):
+        raise EzScriptError("setWindowSize: width and height must be numbers")
+    return _set_window_size(width, height)
+
+
+def _api_setBackground(*args):
+    if len(args) != 1:
+        raise EzScriptError("setBackground(color) expects 1 argument")
+    if not isinstance(args[0], str):
+        raise EzScriptError("setBackground: color must be a string")
+    return _set_background(args[0])
+
+
+def _api_drawCircle(*args):
+    if len(args) < 3 or len(args) > 5:
+        raise EzScriptError("drawCircle(x, y, radius, color?, fill?) expects 3–5 arguments")
+    x, y, radius = args[0], args[1], args[2]
+    color = args[3] if len(args) >= 4 else "black"
+    fill = args[4] if len(args) == 5 else None
+
+    if not isinstance(x, (int, float)) or not isinstance(y, (int, float)) or not isinstance(radius, (int, float)):
+        raise EzScriptError("drawCircle: x, y, radius must be numbers")
+    if not isinstance(color, str):
+        raise EzScriptError("drawCircle: color must be a string")
+    if fill is not None and not isinstance(fill, str):
+        raise EzScriptError("drawCircle: fill must be a string or None")
+    return _draw_circle(x, y, radius, color, fill)
+
+
+def _api_drawRectangle(*args):
+    if len(args) < 4 or len(args) > 6:
+        raise EzScriptError("drawRectangle(x1, y1, x2, y2, color?, fill?) expects 4–6 arguments")
+    x1, y1, x2, y2 = args[0], args[1], args[2], args[3]
+    color = args[4] if len(args) >= 5 else "black"
+    fill = args[5] if len(args) == 6 else None
+
+    if not all(isinstance(v, (int, float)) for v in [x1, y1, x2, y2]):
+        raise EzScriptError("drawRectangle: x1, y1, x2, y2 must be numbers")
+    if not isinstance(color, str):
+        raise EzScriptError("drawRectangle: color must be a string")
+    if fill is not None and not isinstance(fill, str):
+        raise EzScriptError("drawRectangle: fill must be a string or None")
+    return _draw_rectangle(x1, y1, x2, y2, color, fill)
+
+
+def _api_drawLine(*args):
+    if len(args) < 4 or len(args) > 6:
+        raise EzScriptError("drawLine(x1, y1, x2, y2, color?, width?) expects 4–6 arguments")
+    x1, y1, x2, y2 = args[0], args[1], args[2], args[3]
+    color = args[4] if len(args) >= 5 else "black"
+    width = args[5] if len(args) == 6 else 1
+
+    if not all(isinstance(v, (int, float)) for v in [x1, y1, x2, y2]):
+        raise EzScriptError("drawLine: x1, y1, x2, y2 must be numbers")
+    if not isinstance(color, str):
+        raise EzScriptError("drawLine: color must be a string")
+    if not isinstance(width, (int, float)):
+        raise EzScriptError("drawLine: width must be a number")
+    return _draw_line(x1, y1, x2, y2, color, width)
+
+
+def _api_drawText(*args):
+    if len(args) < 3 or len(args) > 5:
+        raise EzScriptError("drawText(x, y, text, color?, fontSize?) expects 3–5 arguments")
+    
+    x, y, text = args[0], args[1], args[2]
+    color = args[3] if len(args) >= 4 else "black"
+    fontSize = args[4] if len(args) == 5 else 12
+
+    if not all(isinstance(v, (int, float)) for v in [x, y]):
+        raise EzScriptError("drawText: x and y must be numbers")
+    if not isinstance(text, str):
+        raise EzScriptError("drawText: text must be a string")
+    if not isinstance(color, str):
+        raise EzScriptError("drawText: color must be a string")
+    if not isinstance(fontSize, (int, float)):
+        raise EzScriptError("drawText: fontSize must be a number")
+
+    return _draw_text(x, y, text, color, fontSize)
+
+
+def _number_rows(name, what, rows, size):
+    """Check a list of `size`-number tuples once; return them as float tuples."""
+    if not isinstance(rows, (list, tuple)):
+        raise EzScriptError(f"{name}: {what} must be a list")
+    out = []
+    for row in rows:
+        if (not isinstance(row, (list, tuple)) or len(row) != size
+                or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in row)):
+            raise EzScriptError(f"{name}: each item of {what} must be {size} numbers, got {row!r}")
+        out.append(tuple(map(float, row)))
+    return out
+
+
+def _api_drawPoints(*args):
+    if len(args) < 1 or len(args) > 3:
+        raise EzScriptError("drawPoints(points, color?, size?) expects 1–3 arguments")
+    points = _number_rows("drawPoints", "points", args[0], 2)
+    color = args[1] if len(args) >= 2 else "black"
+    size = args[2] if len(args) == 3 else 1
+    if not isinstance(color, str):
+        raise EzScriptError("drawPoints: color must be a string")
+    if not isinstance(size, (int, float)):
+        raise EzScriptError("drawPoints: size must be a number")
+    return _draw_points(points, color, size)
+
+
+def _api_drawCircles(*args):
+    if len(args) < 1 or len(args) > 3:
+        raise EzScriptError("drawCircles(circles, color?, fill?) expects 1–3 arguments")
+    circles = _number_rows("drawCircles", "circles", args[0], 3)
+    color = args[1] if len(args) >= 2 else "black"
+    fill = args[2] if len(args) == 3 else None
+    if not isinstance(color, str):
+        raise EzScriptError("drawCircles: color must be a string")
+    if fill is not None and not isinstance(fill, str):
+        raise EzScriptError("drawCircles: fill must be a string or None")
+    return _draw_circles(circles, color, fill)
+
+
+def _api_drawRectangles(*args):
+    if len(args) < 1 or len(args) > 3:
+        raise EzScriptError("drawRectangles(rectangles, color?, fill?) expects 1–3 arguments")
+    rectangles = _number_rows("drawRectangles", "rectangles", args[0], 4)
+    color = args[1] if len(args) >= 2 else "black"
+    fill = args[2] if len(args) == 3 else None
+    if not isinstance(color, str):
+        raise EzScriptError("drawRectangles: color must be a string")
+    if fill is not None and not isinstance(fill, str):
+        raise EzScriptError("drawRectangles: fill must be a string or None")
+    return _draw_rectangles(rectangles, color, fill)
+
+
+def _api_drawPolyline(*args):
+    if len(args) < 1 or len(args) > 3:
+        raise EzScriptError("drawPolyline(points, color?, width?) expects 1–3 arguments")
+    points = _number_rows("drawPolyline", "points", args[0], 2)
+    color = args[1] if len(args) >= 2 else "black"
+    width = args[2] if len(args) == 3 else 1
+    if len(points) < 2:
+        raise EzScriptError("drawPolyline: points needs at least 2 points")
+    if not isinstance(color, str):
+        raise EzScriptError("drawPolyline: color must be a string")
+    if not isinstance(width, (int, float)):
+        raise EzScriptError("drawPolyline: width must be a number")
+    return _draw_polyline(points, color, width)
+
+
+def _api_drawPolygon(*args):
+    if len(args) < 1 or len(args) > 3:
+        raise EzScriptError("drawPolygon(points, color?, fill?) expects 1–3 arguments")
+    points = _number_rows("drawPolygon", "points", args[0], 2)
+    color = args[1] if len(args) >= 2 else "black"
+    fill = args[2] if len(args) == 3 else None
+    if len(points) < 3:
+        raise EzScriptError("drawPolygon: points needs at least 3 points")
+    if not isinstance(color, str):
+        raise EzScriptError("drawPolygon: color must be a string")
+    if fill is not None and not isinstance(fill, str):
+        raise EzScriptError("drawPolygon: fill must be a string or None")
+    return _draw_polygon(points, color, fill)
+
+
+def _check_buffer(name, buf):
+    if not isinstance(buf, PixelBuffer):
+        raise EzScriptError(f"{name}: first argument must be a pixel buffer")
+
+
+def _api_createPixelBuffer(*args):
+    if len(args) < 2 or len(args) > 3:
+        raise EzScriptError("createPixelBuffer(width, height, color?) expects 2–3 arguments")
+    width, height = args[0], args[1]
+    color = args[2] if len(args) == 3 else "black"
+    if not isinstance(width, int) or not isinstance(height, int) or width <= 0 or height <= 0:
+        raise EzScriptError("createPixelBuffer: width and height must be positive whole numbers")
+    return _create_pixel_buffer(width, height, color)
+
+
+def _api_setPixel(*args):
+    if len(args) != 4:
+        raise EzScriptError("setPixel(buffer, x, y, color) expects 4 arguments")
+    buf, x, y, color = args
+    _check_buffer("setPixel", buf)
+    if not isinstance(x, int) or not isinstance(y, int):
+        raise EzScriptError("setPixel: x and y must be whole numbers")
+    return _set_pixel(buf, x, y, _rgb("setPixel", color))
+
+
+def _api_fillPixels(*args):
+    if len(args) != 2 and len(args) != 6:
+        raise EzScriptError("fillPixels(buffer, color, x?, y?, width?, height?) expects 2 or 6 arguments")
+    buf, color = args[0], args[1]
+    _check_buffer("fillPixels", buf)
+    x, y, width, height = args[2:] if len(args) == 6 else (0, 0, buf.width, buf.height)
+    if not all(isinstance(v, int) for v in (x, y, width, height)):
+        raise EzScriptError("fillPixels: x, y, width and height must be whole numbers")
+    return _fill_pixels(buf, _rgb("fillPixels", color), x, y, width, height)
+
+
+def _api_blit(*args):
+    if len(args) < 1 or len(args) > 3:
+        raise EzScriptError("blit(buffer, x?, y?) expects 1–3 arguments")
+    buf = args[0]
+    _check_buffer("blit", buf)
+    x = args[1] if len(args) >= 2 else 0
+    y = args[2] if len(args) == 3 else 0
+    if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
+        raise EzScriptError("blit: x and y must be numbers")
+    return _blit(buf, x, y)
+
+
+def _api_loadImage(*args):
+    if len(args) < 3 or len(args) > 5:
+        raise EzScriptError("loadImage(path, x, y, width?, height?) expects 3–5 arguments")
+    path, x, y = args[0], args[1], args[2]
+    width = args[3] if len(args) >= 4 else None
+    height = args[4] if len(args) == 5 else None
+
+    if not isinstance(path, str):
+        raise EzScriptError("loadImage: path must be a string")
+    if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
+        raise EzScriptError("loadImage: x and y must be numbers")
+    if width is not None and not isinstance(width, (int, float)):
+        raise EzScriptError("loadImage: width must be a number or None")
+    if height is not None and not isinstance(height, (int, float)):
+        raise EzScriptError("loadImage: height must be a number or None")
+
+    return _load_image(path, x, y, width, height)
+
+
+def _api_moveObject(*args):
+    if len(args) != 3:
+        raise EzScriptError("moveObject(object, dx, dy) expects 3 arguments")
+    handle, dx, dy = args
+    if not isinstance(dx, (int, float)) or not isinstance(dy, (int, float)):
+        raise EzScriptError("moveObject: dx and dy must be numbers")
+    return _move_object(handle, dx, dy)
+
+
+def _api_setPosition(*args):
+    if len(args) != 3:
+        raise EzScriptError("setPosition(object, x, y) expects 3 arguments")
+    handle, x, y = args
+    if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
+        raise EzScriptError("setPosition: x and y must be numbers")
+    return _set_position(handle, x, y)
+
+
+def _api_setColor(*args):
+    if len(args) < 2 or len(args) > 3:
+        raise EzScriptError("setColor(object, color, fill?) expects 2–3 arguments")
+    handle, color = args[0], args[1]
+    fill = args[2] if len(args) == 3 else None
+    if not isinstance(color, str):
+        raise EzScriptError("setColor: color must be a string")
+    if fill is not None and not isinstance(fill, str):
+        raise EzScriptError("setColor: fill must be a string or None")
+    return _set_color(handle, color, fill)
+
+
+def _api_setText(*args):
+    if len(args) != 2:
+        raise EzScriptError("setText(object, text) expects 2 arguments")
+    handle, text = args
+    return _set_text(handle, str(text))
+
+
+def _api_deleteObject(*args):
+    if len(args) != 1:
+        raise EzScriptError("deleteObject(object) expects 1 argument")
+    return _delete_object(args[0])
+
+
+def _api_onFrame(*args):
+    if len(args) < 1 or len(args) > 2:
+        raise EzScriptError("onFrame(callback, fps?) expects 1–2 arguments")
+    callback = args[0]
+    fps = args[1] if len(args) == 2 else 60
+    if not callable(callback):
+        raise EzScriptError("onFrame: callback must be a function")
+    if not isinstance(fps, (int, float)) or fps <= 0:
+        raise EzScriptError("onFrame: fps must be a positive number")
+    return _on_frame(callback, fps)
+
+
+def _api_every(*args):
+    if len(args) != 2:
+        raise EzScriptError("every(ms, callback) expects 2 arguments")
+    ms, callback = args
+    if not isinstance(ms, (int, float)) or ms <= 0:
+        raise EzScriptError("every: ms must be a positive number")
+    if not callable(callback):
+        raise EzScriptError("every: callback must be a function")
+    return _every(ms, callback)
+
+
+def _api_cancelTimer(*args):
+    if len(args) != 1:
+        raise EzScriptError("cancelTimer(timer) expects 1 argument")
+    return _cancel_timer(args[0])
+
+
+def _api_frameStats(*args):
+    if len(args) > 1:
+        raise EzScriptError("frameStats(timer?) expects 0–1 arguments")
+    return _frame_stats(args[0] if args else None)
+
+
+def _api_setImageCacheSize(*args):
+    if len(args) != 1:
+        raise EzScriptError("setImageCacheSize(megabytes) expects 1 argument")
+    if not isinstance(args[0], (int, float)) or args[0] < 0:
+        raise EzScriptError("setImageCacheSize: megabytes must be a number of at least 0")
+    return _set_image_cache_size(args[0])
+
+
+def _api_clearWindow(*args):
+    if len(args) != 0:
+        raise EzScriptError("clearWindow() expects 0 arguments")
+    return _clear_window()
+
+
+def _api_updateWindow(*args):
+    if len(args) != 0:
+        raise EzScriptError("updateWindow() expects 0 arguments")
+    return _update_window()
+
+
+def _api_showWindow(*args):
+    if len(args) != 0:
+        raise EzScriptError("showWindow() expects 0 arguments")
+    return _show_window()
+
+
+def _api_closeWindow(*args):
+    if len(args) != 0:
+        raise EzScriptError("closeWindow() expects 0 arguments")
+    return _close_window()
+
+
+def _api_saveFrame(*args):
+    if len(args) != 1:
+        raise EzScriptError("saveFrame(path) expects 1 argument")
+    if not isinstance(args[0], str):
+        raise EzScriptError("saveFrame: path must be a string")
+    return _save_frame(args[0])
+
+
+def _api_setWindowIcon(*args):
+    if len(args) != 1:
+        raise EzScriptError("setWindowIcon(path) expects 1 argument")
+    path = args[0]
+    if not isinstance(path, str):
+        raise EzScriptError("setWindowIcon: path must be a string")
+    return _set_window_icon(path)
+
+
+def _api_removeWindowIcon(*args):
+    if len(args) != 0:
+        raise EzScriptError("removeWindowIcon() expects 0 arguments")
+    return _remove_window_icon()
+
+class Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+class Break(Exception):
+    pass
+
+class Continue(Exception):
+    pass
+
+class EzScriptError(Exception):
+    """Custom exception for EzScript runtime errors"""
+    def __init__(self, message, line_number=None):
+        self.message = message
+        self.line_number = line_number
+        super().__init__(self.message)
+
+def is_comment(line):
+    """Check if a line is a comment based on configured styles."""
+    stripped = line.strip()
+    for style in COMMENT_STYLES:
+        if stripped.startswith(style):
+            return True
+    return False
+
+def strip_inline_comment(line):
+    """Remove inline comments from a line, being careful about strings."""
+    result = ""
+    in_string = False
+    string_char = None
+    i = 0
+    
+    while i < len(line):
+        char = line[i]
+        
+        # Handle string boundaries
+        if char in ('"', "'") and (i == 0 or line[i-1] != '\\'):
+            if not in_string:
+                in_string = True
+                string_char = char
+            elif char == string_char:
+                in_string = False
+                string_char = None
+            result += char
+            i += 1
+            continue
+        
+        # If we're in a string, just add the character
+        if in_string:
+            result += char
+            i += 1
+            continue
+        
+        # Check for comment markers outside of strings
+        for comment_style in COMMENT_STYLES:
+            if line[i:i+len(comment_style)] == comment_style:
+                # Found a comment, return everything before it
+                return result.rstrip()
+        
+        result += char
+        i += 1
+    
+    return result
+
+# ==========================
+# File handle pool
+# ==========================
+
+# How many files write/append keep open at once
+FILE_POOL_SIZE = 16
+
+class OpenFile:
+    """The value of `open file <path> as <name>`; usable wherever a path is."""
+    __slots__ = ("path",)
+
+    def __init__(self, path):
+        self.path = path
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"<open file '{self.path}'>"
+
+class FilePool:
+    """Buffered files kept open by write/append, keyed by absolute path.
+
+    A loop that appends to a log reuses one handle instead of opening and
+    closing the file on every statement. Pending writes reach the disk on
+    `flush file`, before the file is read, before a parallel loop starts
+    its workers, when the least recently used handle is closed to stay
+    within `maxsize`, and when the script ends.
+    Files opened with `open file ... as` stay open until `close`.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._files = OrderedDict()
+        self._pinned = set()
+
+    def write(self, file_path, content, mode):
+        key = os.path.abspath(file_path)
+        f = self._files.get(key)
+        if f is None:
+            f = self._open(key, file_path, mode)
+        else:
+            self._files.move_to_end(key)
+            if mode == 'w':
+                f.seek(0)
+                f.truncate()
+        f.write(content)
+
+    def open(self, file_path):
+        key = os.path.abspath(file_path)
+        if key not in self._files:
+            self._open(key, file_path, 'a')
+        self._pinned.add(key)
+        return OpenFile(os.fspath(file_path))
+
+    def _open(self, key, file_path, mode):
+        f = self._files[key] = open(file_path, mode)
+        # Close the least recently used handles, never the newest
+        for old in list(self._files)[:-1]:
+            if len(self._files) <= self.maxsize:
+                break
+            if old not in self._pinned:
+                self._files.pop(old).close()
+        return f
+
+    def flush(self, file_path):
+        f = self._files.get(os.path.abspath(file_path))
+        if f is not None:
+            f.flush()
+
+    def flush_all(self):
+        for f in self._files.values():
+            f.flush()
+
+    def close(self, file_path):
+        key = os.path.abspath(file_path)
+        self._pinned.discard(key)
+        f = self._files.pop(key, None)
+        if f is not None:
+            f.close()
+
+    def close_all(self):
+        """Close every file, then raise the first error any close hit."""
+        error = None
+        while self._files:
+            _, f = self._files.popitem(last=False)
+            try:
+                f.close()
+            except OSError as e:
+                error = error or e
+        self._pinned.clear()
+        if error is not None:
+            raise error
+
+# ==========================
+# Streaming file readers
+# ==========================
+
+def _open_for_reading(file_path, line_num=None, **kwargs):
+    try:
+        _current().files.flush(file_path)
+        return open(file_path, 'r', **kwargs)
+    except FileNotFoundError:
+        raise EzScriptError(f"File not found: '{file_path}'", line_num)
+    except Exception as e:
+        raise EzScriptError(f"Cannot read file '{file_path}': {e}", line_num)
+
+class FileReader:
+    """Iterates over the records of an open file, one buffered read at a time.
+
+    The file is closed when the records run out, when close() is called
+    (for each does this on break or error) or at the end of a with block.
+    """
+    __slots__ = ("file", "records")
+
+    def __init__(self, file, records):
+        self.file = file
+        self.records = records
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.records)
+        except StopIteration:
+            self.file.close()
+            raise
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+    def __repr__(self):
+        return f"<reader for '{self.file.name}'>"
+
+_chomp = operator.methodcaller("rstrip", "\n")
+
+def _lines(file_path, line_num=None):
+    """Lines of a text file without their line endings."""
+    f = _open_for_reading(file_path, line_num)
+    return FileReader(f, map(_chomp, f))
+
+def _ndjson_records(f, file_path):
+    for number, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise EzScriptError(f"Invalid JSON on line {number} of '{file_path}': {e}")
+
+def _ndjson(file_path, line_num=None):
+    """One parsed value per non-blank line of a newline-delimited JSON file."""
+    f = _open_for_reading(file_path, line_num)
+    return FileReader(f, _ndjson_records(f, file_path))
+
+def _csv_bool(text):
+    return text.strip().lower() in ("true", "yes", "1")
+
+def _typed_csv_rows(reader, names, indices, types, file_path):
+    # bool("false") is True, so bool columns parse the text instead
+    converters = [_csv_bool if t is bool else t for t in types]
+    columns = list(zip(names, indices, converters))
+    for row in reader:
+        record = {}
+        for name, index, convert in columns:
+            try:
+                record[name] = convert(row[index])
+            except Exception as e:
+                raise EzScriptError(f"CSV file '{file_path}' line {reader.line_num}, column '{name}': {e}")
+        yield record
+
+def _csv_rows(file_path, line_num=None, columns=None):
+    """Rows of a CSV file as dicts keyed by the header row.
+
+    `columns` keeps only the named columns: a list of names, or a dict of
+    name -> type (int, float, str, bool or a function) that also converts
+    each value. Parsing is done by the csv module's C reader.
+    """
+    if columns is not None:
+        if isinstance(columns, (list, tuple)):
+            names, types = list(columns), None
+        elif isinstance(columns, dict):
+            names, types = list(columns), list(columns.values())
+            if not all(callable(t) for t in types):
+                raise EzScriptError("with columns: each column type must be a function such as int or float", line_num)
+        else:
+            raise EzScriptError("with columns expects a list of names or a dict of name: type", line_num)
+    import csv
+    f = _open_for_reading(file_path, line_num, newline='')
+    reader = csv.reader(f)
+    header = next(reader, [])
+    if columns is None:
+        return FileReader(f, map(dict, map(zip, repeat(header), reader)))
+    positions = {name: index for index, name in enumerate(header)}
+    missing = [name for name in names if name not in positions]
+    if missing:
+        f.close()
+        raise EzScriptError(f"CSV file '{file_path}' has no column '{missing[0]}'", line_num)
+    indices = [positions[name] for name in names]
+    if types is not None:
+        return FileReader(f, _typed_csv_rows(reader, names, indices, types, file_path))
+    if len(indices) == 1:
+        pick = lambda row, index=indices[0]: (row[index],)
+    else:
+        pick = operator.itemgetter(*indices)
+    return FileReader(f, map(dict, map(zip, repeat(names), map(pick, reader))))
+
+# ==========================
+# Binary buffers
+# ==========================
+
+class EzBuffer:
+    """Read-only bytes, usually a memory-mapped file, that never copies.
+
+    Slicing gives another EzBuffer over the same memory; find, len and
+    readInt work on the mapping directly, so a multi-GB file can be
+    scanned without loading it.
+    """
+    __slots__ = ("data", "start", "stop")
+
+    def __init__(self, data, start=0, stop=None):
+        self.data = data
+        self.start = start
+        self.stop = len(data) if stop is None else stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise EzScriptError("Buffer slices cannot have a step")
+            return EzBuffer(self.data, self.start + start, self.start + max(start, stop))
+        if not isinstance(key, int) or isinstance(key, bool):
+            raise EzScriptError(f"Buffer index must be a whole number, not {type(key).__name__}")
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise EzScriptError(f"Buffer index {key} out of range")
+        return self.data[self.start + key]
+
+    def __iter__(self):
+        return iter(self.view)
+
+    def __contains__(self, needle):
+        return self.find(needle) >= 0
+
+    def __repr__(self):
+        return f"<buffer of {len(self)} bytes>"
+
+    @property
+    def view(self):
+        return memoryview(self.data)[self.start:self.stop]
+
+    def find(self, needle, start=0, end=None):
+        """Offset of the first `needle` (bytes or text) at or after `start`, or -1."""
+        if isinstance(needle, str):
+            needle = needle.encode()
+        elif isinstance(needle, EzBuffer):
+            needle = needle.view
+        start, end, _ = slice(start, end).indices(len(self))
+        found = self.data.find(needle, self.start + start, self.start + end)
+        return found - self.start if found >= 0 else -1
+
+    def decode(self, encoding="utf-8", errors="strict"):
+        return str(self.view, encoding, errors)
+
+def _map_file(file_path):
+    import mmap
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map an empty file
+            return EzBuffer(b"")
+        return EzBuffer(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+def _read_int(buf, offset, size, byteorder="little", signed=False):
+    if not isinstance(buf, EzBuffer):
+        raise EzScriptError("readInt: first argument must be a buffer from 'map file'")
+    if any(not isinstance(n, int) or isinstance(n, bool) for n in (offset, size)) or size <= 0:
+        raise EzScriptError("readInt: offset and size must be whole numbers")
+    if byteorder not in ("little", "big"):
+        raise EzScriptError("readInt: byteorder must be \"little\" or \"big\"")
+    if offset < 0 or offset + size > len(buf):
+        raise EzScriptError(f"readInt: {size} bytes at offset {offset} are outside the {len(buf)}-byte buffer")
+    start = buf.start + offset
+    return int.from_bytes(memoryview(buf.data)[start:start + size], byteorder, signed=signed)
+
+# Sources for "for each <var> in <source> <path>:", by source keyword
+_FILE_SOURCES = {
+    'file': _lines,
+    'ndjson file': _ndjson,
+    'csv file': _csv_rows,
+}
+
+# ==========================
+# Tasks (spawn, await, gather)
+# ==========================
+# A script runs as nested Python calls, so a task cannot be suspended like a
+# coroutine. Each task gets its own thread instead, and the interpreter's
+# baton (a lock) lets one of them run EzScript at a time. The running task
+# hands the baton over only while it waits (wait, await, gather, input);
+# the waiting itself is scheduled on the interpreter's asyncio event loop.
+# Tk windows belong to the thread that created them, so tasks that draw
+# should use the pil backend.
+
+class EzTask:
+    """A spawned function call; `await` or gather() give its result."""
+    __slots__ = ("name", "future", "retrieved")
+
+    def __init__(self, name, future):
+        self.name = name
+        # concurrent.futures.Future of the task's coroutine on the event loop
+        self.future = future
+        self.retrieved = False
+
+    def __repr__(self):
+        return f"<task {self.name} {'done' if self.future.done() else 'running'}>"
+
+class _TaskCancelled(BaseException):
+    """Unwinds a task whose script failed; not an error of the task."""
+
+async def _cancel_pending():
+    import asyncio
+    current = asyncio.current_task()
+    pending = [task for task in asyncio.all_tasks() if task is not current]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+def _api_spawn(*args):
+    if not args:
+        raise EzScriptError("spawn(function, ...) expects a function to run")
+    if not callable(args[0]):
+        raise EzScriptError("spawn: the first argument must be a function")
+    return _current().spawn(args[0], args[1:])
+
+def _await_task(task, line_num=None):
+    if not isinstance(task, EzTask):
+        raise EzScriptError("await expects a task from spawn", line_num)
+    return _current().await_tasks([task])[0]
+
+def _api_gather(*args):
+    if len(args) != 1 or not isinstance(args[0], (list, tuple)):
+        raise EzScriptError("gather(tasks) expects a list of tasks")
+    tasks = list(args[0])
+    if not all(isinstance(task, EzTask) for task in tasks):
+        raise EzScriptError("gather: every item must be a task from spawn")
+    return _current().await_tasks(tasks)
+
+def _input(*prompt):
+    return _current().blocking(input, *prompt)
+
+# ==========================
+# Memoized functions
+# ==========================
+
+# Results a memo function keeps unless memoize() is given another size
+MEMO_CACHE_SIZE = 1024
+
+# Separates positional from keyword arguments in a memo cache key
+_KWARGS_MARK = object()
+_NOT_CACHED = object()
+
+class EzMemo:
+    """A function that remembers its results by argument, evicting the
+    least recently used once `maxsize` are kept.
+
+    Calls with an argument that cannot be a dict key (a list or dict) run
+    the function every time and are not counted. Errors are not cached.
+    """
+    __slots__ = ("name", "function", "cache")
+
+    def __init__(self, function, maxsize=MEMO_CACHE_SIZE):
+        self.name = getattr(function, "name", None) or getattr(function, "__name__", "function")
+        self.function = function
+        self.cache = LRUCache(maxsize)
+
+    def __call__(self, *args, **kwargs):
+        key = args
+        if kwargs:
+            key = args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+        try:
+            value = self.cache.get(key, _NOT_CACHED)
+        except TypeError:
+            return self.function(*args, **kwargs)
+        if value is _NOT_CACHED:
+            value = self.function(*args, **kwargs)
+            self.cache.put(key, value)
+        return value
+
+    def __repr__(self):
+        return f"<memo function {self.name}>"
+
+def _api_memoize(*args):
+    if len(args) not in (1, 2):
+        raise EzScriptError("memoize(function, maxsize?) expects 1 or 2 arguments")
+    if not callable(args[0]):
+        raise EzScriptError("memoize: the first argument must be a function")
+    maxsize = args[1] if len(args) == 2 else MEMO_CACHE_SIZE
+    if not isinstance(maxsize, int) or isinstance(maxsize, bool) or maxsize <= 0:
+        raise EzScriptError("memoize: maxsize must be a positive whole number")
+    return EzMemo(args[0], maxsize)
+
+def _memo_arg(name, args):
+    if len(args) != 1:
+        raise EzScriptError(f"{name}(function) expects 1 argument")
+    if not isinstance(args[0], EzMemo):
+        raise EzScriptError(f"{name}: {args[0]!r} is not a memo function")
+    return args[0]
+
+def _api_cacheInfo(*args):
+    cache = _memo_arg("cacheInfo", args).cache
+    return {"hits": cache.hits, "misses": cache.misses, "maxsize": cache.maxsize, "size": len(cache)}
+
+def _api_cacheClear(*args):
+    _memo_arg("cacheClear", args).cache.clear()
+
+# Built-in functions available to expressions, built once at import
+BUILTINS = {
+    'len': len,
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': bool,
+    'abs': abs,
+    'max': max,
+    'min': min,
+    'sum': sum,
+    'round': round,
+    'range': range,
+    'list': list,
+    'dict': dict,
+    'set': set,
+    'tuple': tuple,
+    'type': type,
+    'sorted': sorted,
+    'reversed': reversed,
+    'enumerate': enumerate,
+    'zip': zip,
+    'all': all,
+    'any': any,
+    'input': _input,
+    'random': random.randint,
+    'choice': random.choice,
+    'shuffle': random.shuffle,
+    'randrange': random.randrange,
+    'uniform': random.uniform,
+    'current_time': lambda: datetime.now().strftime("%H:%M:%S"),
+    'current_date': lambda: datetime.now().strftime("%Y-%m-%d"),
+    'current_datetime': lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    'timestamp': lambda: int(datetime.now().timestamp()),
+    'lines': _lines,
+    'readInt': _read_int,
+    'memoize': _api_memoize,
+    'cacheInfo': _api_cacheInfo,
+    'cacheClear': _api_cacheClear,
+    'spawn': _api_spawn,
+    'gather': _api_gather,
+    'createWindow': _api_createWindow,
+    'setWindowTitle': _api_setWindowTitle,
+    'setWindowSize': _api_setWindowSize,
+    'setBackground': _api_setBackground,
+    'drawCircle': _api_drawCircle,
+    'drawRectangle': _api_drawRectangle,
+    'drawLine': _api_drawLine,
+    'drawText': _api_drawText,
+    'drawPoints': _api_drawPoints,
+    'drawCircles': _api_drawCircles,
+    'drawRectangles': _api_drawRectangles,
+    'drawPolyline': _api_drawPolyline,
+    'drawPolygon': _api_drawPolygon,
+    'loadImage': _api_loadImage,
+    'createPixelBuffer': _api_createPixelBuffer,
+    'setPixel': _api_setPixel,
+    'fillPixels': _api_fillPixels,
+    'blit': _api_blit,
+    'setImageCacheSize': _api_setImageCacheSize,
+    'moveObject': _api_moveObject,
+    'setPosition': _api_setPosition,
+    'setColor': _api_setColor,
+    'setText': _api_setText,
+    'deleteObject': _api_deleteObject,
+    'clearWindow': _api_clearWindow,
+    'updateWindow': _api_updateWindow,
+    'showWindow': _api_showWindow,
+    'closeWindow': _api_closeWindow,
+    'saveFrame': _api_saveFrame,
+    'setWindowIcon': _api_setWindowIcon,
+    'removeWindowIcon': _api_removeWindowIcon,
+    'onKeyDown': _api_onKeyDown,
+    'onKeyUp': _api_onKeyUp,
+    'onFrame': _api_onFrame,
+    'every': _api_every,
+    'cancelTimer': _api_cancelTimer,
+    'frameStats': _api_frameStats,
+}
+
+# Marks a local slot that has not been assigned yet
+_UNBOUND = object()
+
+class Scope:
+    """Name lookup for expressions without copying any dictionaries.
+
+    Names resolve through the layers local variables -> enclosing functions'
+    local variables -> global variables -> functions -> builtins. A Scope is
+    passed to eval() as its locals mapping. Each EzInterpreter has its own
+    builtins (keyStates is per interpreter).
+
+    The global scope has no locals. Each function call gets its own Scope
+    whose locals are a list of slots; `index` maps local names to slot
+    numbers and is shared by every call of the same function. `enclosing`
+    is the Scope of the call that defined the function, if it was defined
+    inside another function. Assignments never reach it: they bind a local
+    or a global, as in compiled scripts.
+    """
+    __slots__ = ("index", "slots", "globals", "functions", "builtins", "enclosing")
+
+    def __init__(self, globals, functions, index=None, slots=None, builtins=BUILTINS, enclosing=None):
+        self.index = index
+        self.slots = slots
+        self.globals = globals
+        self.functions = functions
+        self.builtins = builtins
+        self.enclosing = enclosing
+
+    def __getitem__(self, name):
+        index = self.index
+        if index is not None:
+            slot = index.get(name)
+            if slot is not None:
+                value = self.slots[slot]
+                if value is not _UNBOUND:
+                    return value
+            if self.enclosing is not None:
+                value = self.enclosing.local(name)
+                if value is not _UNBOUND:
+                    return value
+        try:
+            return self.globals[name]
+        except KeyError:
+            pass
+        try:
+            return self.functions[name]
+        except KeyError:
+            pass
+        return self.builtins[name]
+
+    def __contains__(self, name):
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def assign(self, name, value):
+        """Bind a variable: local if the function declares it, else global."""
+        index = self.index
+        if index is not None:
+            slot = index.get(name)
+            if slot is not None:
+                self.slots[slot] = value
+                return
+        self.globals[name] = value
+
+    def local(self, name):
+        """Value of `name` in this or an enclosing function's locals, or
+        _UNBOUND if none of them has it set."""
+        scope = self
+        while scope is not None and scope.index is not None:
+            slot = scope.index.get(name)
+            if slot is not None:
+                value = scope.slots[slot]
+                if value is not _UNBOUND:
+                    return value
+            scope = scope.enclosing
+        return _UNBOUND
+
+    def lookup_var(self, name):
+        """Value of a local, enclosing or global variable; KeyError if none
+        is set."""
+        value = self.local(name)
+        if value is not _UNBOUND:
+            return value
+        return self.globals[name]
+
+# Globals for eval(): Python's own builtins are deliberately not reachable
+_EVAL_GLOBALS = {"__builtins__": {}}
+
+# ==========================
+# Expression compiler and cache
+# ==========================
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+class LRUCache:
+    """A bounded mapping that evicts the least recently used entry.
+
+    With `maxcost`, entries are also evicted while the total of the costs
+    passed to put() is above it. The newest entry is always kept.
+
+    Safe to share between threads: changes take a lock, while get() stays
+    lock-free because it runs for every expression evaluated. A hit whose
+    entry another thread just evicted is still a hit.
+    """
+
+    def __init__(self, maxsize, maxcost=None):
+        self.maxsize = maxsize
+        self.maxcost = maxcost
+        self.cost = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._costs = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value, cost=0):
+        with self._lock:
+            data = self._data
+            data[key] = value
+            data.move_to_end(key)
+            if cost or self._costs:
+                self.cost += cost - self._costs.get(key, 0)
+                self._costs[key] = cost
+            self._evict()
+
+    def resize(self, maxsize=None, maxcost=None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if maxcost is not None:
+                self.maxcost = maxcost
+            self._evict()
+
+    def _evict(self):
+        data = self._data
+        maxcost = self.maxcost
+        while len(data) > self.maxsize or (
+                maxcost is not None and self.cost > maxcost and len(data) > 1):
+            key, _ = data.popitem(last=False)
+            self.cost -= self._costs.pop(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._costs.clear()
+            self.cost = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+# Maximum number of distinct expression texts kept compiled
+EXPR_CACHE_SIZE = 4096
+
+_expr_cache = LRUCache(EXPR_CACHE_SIZE)
+
+# Memory budget for decoded loadImage images, estimated at 4 bytes a pixel;
+# setImageCacheSize changes it at run time. Each EzInterpreter has its own
+# image cache, since the images belong to its window.
+IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+# Natural language operators and their Python equivalents, applied in order
+_NATURAL_OPERATORS = [
+    (" is equal to ", " == "),
+    (" greater or equal to ", " >= "),
+    (" lesser or equal to ", " <= "),
+    (" greater than ", " > "),
+    (" less than ", " < "),
+    (" not equal to ", " != "),
+    (" is not ", " != "),
+    (" is ", " == "),
+    (" true", " True"),
+    (" false", " False"),
+]
+
+def expr_cache_info():
+    """Return (hits, misses, maxsize, currsize) for the expression cache."""
+    return _expr_cache.info()
+
+def image_cache_info():
+    """Return (hits, misses, maxsize, currsize) for the loadImage cache."""
+    return _current().image_cache.info()
+
+def expr_cache_clear():
+    """Drop all compiled expressions and reset the counters."""
+    _expr_cache.clear()
+
+def _process_escapes(text):
+    text = text.replace('\\n', '\n')
+    text = text.replace('\\t', '\t')
+    text = text.replace('\\r', '\r')
+    text = text.replace('\\\\', '\\')
+    return text
+
+def _string_literal_end(expr, start=0):
+    """Index just past the string literal opening at expr[start], or -1."""
+    quote = expr[start]
+    i = start + 1
+    while i < len(expr):
+        char = expr[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == quote:
+            return i + 1
+        i += 1
+    return -1
+
+def _is_string_literal(expr):
+    """True if the whole expression is one quoted string."""
+    return expr[:1] in ('"', "'") and _string_literal_end(expr) == len(expr)
+
+def _split_strings(expr):
+    """Split an expression into (is_string, text) pieces."""
+    pieces = []
+    code_start = i = 0
+    while i < len(expr):
+        if expr[i] in ('"', "'"):
+            end = _string_literal_end(expr, i)
+            if end == -1:
+                break
+            if code_start < i:
+                pieces.append((False, expr[code_start:i]))
+            pieces.append((True, expr[i:end]))
+            code_start = i = end
+        else:
+            i += 1
+    if code_start < len(expr):
+        pieces.append((False, expr[code_start:]))
+    return pieces
+
+def _translate_operators(code):
+    for phrase, operator in _NATURAL_OPERATORS:
+        code = code.replace(phrase, operator)
+    return code
+
+def _translate_expr(expr):
+    """Rewrite natural language operators into Python syntax.
+
+    Text inside string literals is left alone, except that literals with
+    {placeholders} become f-strings so they interpolate inside larger
+    expressions such as "Hi {name}" + suffix.
+    """
+    translated = []
+    for is_string, text in _split_strings(expr):
+        if not is_string:
+            translated.append(_translate_operators(text))
+        elif '{' in text and '}' in text and not (translated and translated[-1][-1:].isalnum()):
+            translated.append(_fstring_literal(text))
+        else:
+            translated.append(text)
+    return "".join(translated)
+
+# ==========================
+# String interpolation templates
+# ==========================
+
+# Maximum number of distinct interpolated string literals kept parsed
+TEMPLATE_CACHE_SIZE = 1024
+
+_template_cache = LRUCache(TEMPLATE_CACHE_SIZE)
+
+def _split_placeholders(content):
+    """Split string content into literal text and {placeholder} pieces.
+
+    Returns a list of (is_placeholder, text); placeholder text excludes the
+    braces. Unbalanced braces are kept as literal text.
+    """
+    pieces = []
+    literal_start = i = 0
+    while i < len(content):
+        if content[i] != '{':
+            i += 1
+            continue
+        depth = 0
+        j = i
+        while j < len(content):
+            if content[j] == '{':
+                depth += 1
+            elif content[j] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            j += 1
+        if j == len(content):
+            break
+        if literal_start < i:
+            pieces.append((False, content[literal_start:i]))
+        pieces.append((True, content[i+1:j]))
+        literal_start = i = j + 1
+    if literal_start < len(content):
+        pieces.append((False, content[literal_start:]))
+    return pieces
+
+def _placeholder_source(text):
+    """Python source for a placeholder expression, or None if it is not one."""
+    text = text.strip()
+    if not text or '\\' in text:
+        return None
+    source = _translate_expr(text)
+    _import_ast()
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError:
+        return None
+    # "{1, 2}" reads as set-like text, not as a tuple expression
+    if isinstance(tree.body, ast.Tuple):
+        return None
+    return source
+
+def _fstring_literal(literal):
+    """Turn a quoted literal with {placeholders} into f-string source."""
+    parts = []
+    for is_placeholder, text in _split_placeholders(literal[1:-1]):
+        source = _placeholder_source(text) if is_placeholder else None
+        if source is not None:
+            parts.append("{" + source + "}")
+        else:
+            if is_placeholder:
+                text = "{" + text + "}"
+            parts.append(text.replace("{", "{{").replace("}", "}}"))
+    return "f" + literal[0] + "".join(parts) + literal[0]
+
+class Template:
+    """An interpolated string literal parsed into segments.
+
+    Each segment is either literal text or a placeholder. A placeholder that
+    names a variable renders its value, or stays as written if the variable
+    does not exist. Any other placeholder that is a valid expression is
+    evaluated; braces around anything else are kept as literal text.
+    """
+    __slots__ = ("segments",)
+
+    def __init__(self, content):
+        segments = []
+        for is_placeholder, text in _split_placeholders(content):
+            raw = "{" + text + "}"
+            if not is_placeholder:
+                segments.append(_process_escapes(text))
+            elif text.strip().isidentifier():
+                segments.append((text.strip(), None, raw))
+            elif _placeholder_source(text) is not None:
+                segments.append((None, _compile_expr(text), raw))
+            else:
+                segments.append(_process_escapes(raw))
+        self.segments = segments
+
+    def render(self, scope, line_num):
+        out = []
+        for segment in self.segments:
+            if segment.__class__ is str:
+                out.append(segment)
+                continue
+            name, evaluate, raw = segment
+            if name is not None:
+                try:
+                    out.append(str(scope.lookup_var(name)))
+                except KeyError:
+                    out.append(raw)
+            else:
+                out.append(str(evaluate(scope, line_num)))
+        return "".join(out)
+
+def _compile_template(content):
+    """Return the cached Template for a string literal's content."""
+    template = _template_cache.get(content)
+    if template is None:
+        template = Template(content)
+        _template_cache.put(content, template)
+    return template
+
+def _translate_error(e, line_num=None):
+    """Convert a Python exception from an expression into an EzScriptError."""
+    if isinstance(e, EzScriptError):
+        return e
+    if isinstance(e, RecursionError):
+        return EzScriptError(RECURSION_MESSAGE, line_num)
+    if isinstance(e, NameError):
+        var_name = str(e).split("'")[1] if "'" in str(e) else "unknown"
+        return EzScriptError(f"Variable '{var_name}' is not defined", line_num)
+    if isinstance(e, ZeroDivisionError):
+        return EzScriptError("Cannot divide by zero", line_num)
+    if isinstance(e, IndexError):
+        return EzScriptError(f"List index out of range: {e}", line_num)
+    if isinstance(e, KeyError):
+        return EzScriptError(f"Dictionary key not found: {e}", line_num)
+    if isinstance(e, TypeError):
+        return EzScriptError(f"Type error: {e}", line_num)
+    # Don't silently return the expression as string - raise the error
+    return EzScriptError(f"Invalid expression: {e}", line_num)
+
+def _run_code(code, scope, line_num):
+    """Evaluate a compiled expression, mapping Python errors to EzScriptError."""
+    try:
+        return eval(code, _EVAL_GLOBALS, scope)
+    except EzScriptError:
+        # Re-raise EzScriptError without wrapping it
+        raise
+    except Exception as e:
+        raise _translate_error(e, line_num)
+
+def _compile_expr(expr, line_num=None):
+    """Translate an expression once and return a callable that evaluates it.
+
+    The callable takes the Scope to resolve names in and the line number to
+    report errors against.
+    """
+    expr = expr.strip()
+    try:
+        value = int(expr)
+        return lambda scope, line_num: value
+    except ValueError:
+        pass
+    try:
+        value = float(expr)
+        return lambda scope, line_num: value
+    except ValueError:
+        pass
+
+    # Handle string literals, interpolating {} placeholders
+    if _is_string_literal(expr):
+        string_content = expr[1:-1]
+        if '{' in string_content and '}' in string_content:
+            return _compile_template(string_content).render
+        value = _process_escapes(string_content)
+        return lambda scope, line_num: value
+
+    # Handle dictionary literals {key: value, ...}
+    if expr.startswith("{") and expr.endswith("}"):
+        dict_content = expr[1:-1].strip()
+        items = []
+        for part in _split_top_level(dict_content):
+            if ":" not in part:
+                raise EzScriptError(f"Invalid dictionary item: {part}", line_num)
+            k, v = part.split(":", 1)
+            items.append((_compile_expr(k, line_num), _compile_expr(v, line_num)))
+
+        def build_dict(scope, line_num):
+            return {key(scope, line_num): value(scope, line_num) for key, value in items}
+        return build_dict
+
+    expr = _translate_expr(expr)
+    if expr == "true":
+        return lambda scope, line_num: True
+    if expr == "false":
+        return lambda scope, line_num: False
+
+    try:
+        code = compile(expr, "<string>", "eval")
+    except SyntaxError as e:
+        raise EzScriptError(f"Syntax error in expression: {e}", line_num)
+    except Exception as e:
+        raise EzScriptError(f"Invalid expression: {e}", line_num)
+    return lambda scope, line_num: _run_code(code, scope, line_num)
+
+def eval_expr(expr, line_num=None, scope=None):
+    """Evaluate an expression using current variables and built-in functions."""
+    evaluate = _expr_cache.get(expr)
+    if evaluate is None:
+        evaluate = _compile_expr(expr, line_num)
+        _expr_cache.put(expr, evaluate)
+    return evaluate(scope or _current().scope, line_num)
+
+# ==========================
+# Parser: source lines -> statement tree
+# ==========================
+
+def _indent_of(line):
+    """Number of leading whitespace characters in a line."""
+    return len(line) - len(line.lstrip())
+
+def _find_block_end(lines, start, indent):
+    """Return the index of the first line at or below `indent` after `start`."""
+    end = start
+    while end < len(lines):
+        l = lines[end]
+        if not l.strip() or is_comment(l):
+            end += 1
+            continue
+        if _indent_of(l) <= indent:
+            break
+        end += 1
+    return end
+
+def _split_top_level(expr):
+    """Split an expression on commas that are not inside brackets or strings."""
+    parts = []
+    current = ""
+    depth = 0
+    in_string = False
+    string_char = None
+
+    for char in expr:
+        if char in ('"', "'") and (not in_string or char == string_char):
+            in_string = not in_string
+            string_char = char if in_string else None
+            current += char
+        elif not in_string:
+            if char in '([{':
+                depth += 1
+                current += char
+            elif char in ')]}':
+                depth -= 1
+                current += char
+            elif char == ',' and depth == 0:
+                parts.append(current.strip())
+                current = ""
+            else:
+                current += char
+        else:
+            current += char
+
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+# ==========================
+# Statement helpers shared by the executor and compiled code
+# ==========================
+
+def _print_values(*values):
+    print(" ".join([str(value) for value in values]))
+
+def _read_file(file_path, line_num, format=None):
+    """Contents of a file: the text, with format="json" the parsed value,
+    with format="map" an EzBuffer over the memory-mapped bytes."""
+    try:
+        _current().files.flush(file_path)
+        if format == 'map':
+            return _map_file(file_path)
+        with open(file_path, 'r') as f:
+            if format == 'json':
+                return json.load(f)
+            return f.read()
+    except FileNotFoundError:
+        raise EzScriptError(f"File not found: '{file_path}'", line_num)
+    except json.JSONDecodeError as e:
+        raise EzScriptError(f"Invalid JSON in '{file_path}': {e}", line_num)
+    except Exception as e:
+        raise EzScriptError(f"Cannot read file '{file_path}': {e}", line_num)
+
+def _encode_json(value, mode, line_num):
+    # A whole document for write, one NDJSON line for append
+    try:
+        if mode == 'w':
+            return json.dumps(value, indent=2, ensure_ascii=False) + "\n"
+        return json.dumps(value, ensure_ascii=False) + "\n"
+    except (TypeError, ValueError) as e:
+        raise EzScriptError(f"Cannot write as JSON: {e}", line_num)
+
+# One reusable writer, made on first use, so each append does not build a
+# new csv.writer; the lock keeps interpreters in other threads from sharing
+# its buffer
+_csv_buffer = io.StringIO()
+_csv_writer = None
+_csv_lock = threading.Lock()
+
+def _encode_csv(value, mode, line_num):
+    # write takes a list of rows, append a single row. Dict rows are
+    # written as their values; for write, the first dict's keys become
+    # the header row.
+    rows = value if mode == 'w' else [value]
+    if not isinstance(rows, (list, tuple)):
+        raise EzScriptError("write csv expects a list of rows", line_num)
+    global _csv_writer
+    import csv
+    with _csv_lock:
+        if _csv_writer is None:
+            _csv_writer = csv.writer(_csv_buffer, lineterminator="\n")
+        try:
+            if mode == 'w' and rows and isinstance(rows[0], dict):
+                _csv_writer.writerow(rows[0].keys())
+            _csv_writer.writerows(row.values() if isinstance(row, dict) else row for row in rows)
+            return _csv_buffer.getvalue()
+        except csv.Error as e:
+            raise EzScriptError(f"Cannot write as CSV: {e}", line_num)
+        finally:
+            _csv_buffer.seek(0)
+            _csv_buffer.truncate()
+
+def _write_file(content, file_path, mode, line_num, format=None):
+    if format == 'json':
+        content = _encode_json(content, mode, line_num)
+    elif format == 'csv':
+        content = _encode_csv(content, mode, line_num)
+    else:
+        content = str(content)
+    try:
+        _current().files.write(file_path, content, mode)
+    except Exception as e:
+        action = "write to" if mode == 'w' else "append to"
+        raise EzScriptError(f"Cannot {action} file '{os.fspath(file_path)}': {e}", line_num)
+
+def _flush_file(file_path, line_num):
+    try:
+        _current().files.flush(file_path)
+    except Exception as e:
+        raise EzScriptError(f"Cannot flush file '{os.fspath(file_path)}': {e}", line_num)
+
+def _open_file(file_path, line_num):
+    try:
+        return _current().files.open(file_path)
+    except Exception as e:
+        raise EzScriptError(f"Cannot open file '{os.fspath(file_path)}': {e}", line_num)
+
+def _close_file(handle, line_num):
+    if not isinstance(handle, OpenFile):
+        raise EzScriptError("close expects a file opened with 'open file ... as'", line_num)
+    try:
+        _current().files.close(handle)
+    except Exception as e:
+        raise EzScriptError(f"Cannot close file '{handle.path}': {e}", line_num)
+
+def _unpack(value, count):
+    """Values for `let a, b be ...`: unpack a matching list/tuple, else repeat."""
+    if isinstance(value, (list, tuple)) and len(value) == count:
+        return list(value)
+    return [value] * count
+
+class Stmt(ABC):
+    """Base class for parsed statements. `line` is the 1-based source line."""
+    __slots__ = ("line",)
+
+    @abstractmethod
+    def execute(self, scope):
+        """Run the statement in `scope`."""
+
+class ErrorStmt(Stmt):
+    """A line that parsed into an error; it is raised only if executed."""
+    __slots__ = ("message",)
+
+    def __init__(self, line, message):
+        self.line = line
+        self.message = message
+
+    def execute(self, scope):
+        raise EzScriptError(self.message, self.line)
+
+class FunctionDefStmt(Stmt):
+    """`function name(params):`, or `memo function name(params):` to cache results."""
+    __slots__ = ("name", "params", "default_exprs", "body", "slot_index", "memo")
+
+    def __init__(self, line, name, params, default_exprs, body, memo=False):
+        self.line = line
+        self.name = name
+        self.params = params
+        self.default_exprs = default_exprs
+        self.body = body
+        self.memo = memo
+        # Parameters take the first slots, then every name the body assigns
+        self.slot_index = {}
+        for var_name in params + sorted(local_names(body) - set(params)):
+            self.slot_index[var_name] = len(self.slot_index)
+
+    def execute(self, scope):
+        defaults = {}
+        for param_name, default_expr in self.default_exprs.items():
+            defaults[param_name] = eval_expr(default_expr, self.line, scope)
+        enclosing = scope if scope.index is not None else None
+        function = EzFunction(self, defaults, scope.globals, scope.functions, scope.builtins, enclosing)
+        scope.functions[self.name] = EzMemo(function) if self.memo else function
+
+class ReturnStmt(Stmt):
+    __slots__ = ("exprs",)
+
+    def __init__(self, line, exprs):
+        self.line = line
+        self.exprs = exprs
+
+    def execute(self, scope):
+        exprs = self.exprs
+        if exprs is None:
+            raise Return(None)
+        if len(exprs) == 1:
+            raise Return(eval_expr(exprs[0], self.line, scope))
+        raise Return(tuple(eval_expr(part, self.line, scope) for part in exprs))
+
+class BreakStmt(Stmt):
+    __slots__ = ()
+
+    def __init__(self, line):
+        self.line = line
+
+    def execute(self, scope):
+        raise Break()
+
+class ContinueStmt(Stmt):
+    __slots__ = ()
+
+    def __init__(self, line):
+        self.line = line
+
+    def execute(self, scope):
+        raise Continue()
+
+class ThrowStmt(Stmt):
+    __slots__ = ("expr",)
+
+    def __init__(self, line, expr):
+        self.line = line
+        self.expr = expr
+
+    def execute(self, scope):
+        error_msg = eval_expr(self.expr, self.line, scope)
+        raise EzScriptError(str(error_msg), self.line)
+
+class ReadFileStmt(Stmt):
+    """`let x be read [json] file ...` and `let x be map file ...`"""
+    __slots__ = ("var_name", "file_expr", "format")
+
+    def __init__(self, line, var_name, file_expr, format=None):
+        self.line = line
+        self.var_name = var_name
+        self.file_expr = file_expr
+        self.format = format
+
+    def execute(self, scope):
+        file_path = eval_expr(self.file_expr, self.line, scope)
+        scope.assign(self.var_name, _read_file(file_path, self.line, self.format))
+
+class LetStmt(Stmt):
+    __slots__ = ("var_name", "expr")
+
+    def __init__(self, line, var_name, expr):
+        self.line = line
+        self.var_name = var_name
+        self.expr = expr
+
+    def execute(self, scope):
+        scope.assign(self.var_name, eval_expr(self.expr, self.line, scope))
+
+class MultiLetStmt(Stmt):
+    """`let a, b be ...`: unpacks a matching list/tuple, else assigns to all."""
+    __slots__ = ("var_names", "expr")
+
+    def __init__(self, line, var_names, expr):
+        self.line = line
+        self.var_names = var_names
+        self.expr = expr
+
+    def execute(self, scope):
+        var_names = self.var_names
+        value = eval_expr(self.expr, self.line, scope)
+        for var, val in zip(var_names, _unpack(value, len(var_names))):
+            scope.assign(var, val)
+
+class AugAssignStmt(Stmt):
+    __slots__ = ("var_name", "op", "expr")
+
+    def __init__(self, line, var_name, op, expr):
+        self.line = line
+        self.var_name = var_name
+        self.op = op
+        self.expr = expr
+
+    def execute(self, scope):
+        var = self.var_name
+        # Update a bound local if there is one, otherwise the global
+        index = scope.index
+        slot = index.get(var) if index is not None else None
+        if slot is not None and scope.slots[slot] is not _UNBOUND:
+            target, key = scope.slots, slot
+        elif var in scope.globals:
+            target, key = scope.globals, var
+        else:
+            raise EzScriptError(f"Variable '{var}' is not defined", self.line)
+        expr_val = eval_expr(self.expr, self.line, scope)
+        target[key] = _AUG_OPERATORS[self.op](target[key], expr_val)
+
+class PrintStmt(Stmt):
+    __slots__ = ("parts",)
+
+    def __init__(self, line, parts):
+        self.line = line
+        self.parts = parts
+
+    def execute(self, scope):
+        _print_values(*[eval_expr(part, self.line, scope) for part in self.parts])
+
+class WaitStmt(Stmt):
+    __slots__ = ("expr",)
+
+    def __init__(self, line, expr):
+        self.line = line
+        self.expr = expr
+
+    def execute(self, scope):
+        _current().wait(float(eval_expr(self.expr, self.line, scope)))
+
+class AwaitStmt(Stmt):
+    """`await <task>` and `let <name> be await <task>`."""
+    __slots__ = ("var_name", "expr")
+
+    def __init__(self, line, var_name, expr):
+        self.line = line
+        self.var_name = var_name
+        self.expr = expr
+
+    def execute(self, scope):
+        value = _await_task(eval_expr(self.expr, self.line, scope), self.line)
+        if self.var_name is not None:
+            scope.assign(self.var_name, value)
+
+class WriteFileStmt(Stmt):
+    """`write [json|csv] ... to file ...` (mode "w") and `append [json|csv] ... to file ...` (mode "a")."""
+    __slots__ = ("content_expr", "file_expr", "mode", "format")
+
+    def __init__(self, line, content_expr, file_expr, mode, format=None):
+        self.line = line
+        self.content_expr = content_expr
+        self.file_expr = file_expr
+        self.mode = mode
+        self.format = format
+
+    def execute(self, scope):
+        content = eval_expr(self.content_expr, self.line, scope)
+        file_path = eval_expr(self.file_expr, self.line, scope)
+        _write_file(content, file_path, self.mode, self.line, self.format)
+
+class FlushFileStmt(Stmt):
+    __slots__ = ("file_expr",)
+
+    def __init__(self, line, file_expr):
+        self.line = line
+        self.file_expr = file_expr
+
+    def execute(self, scope):
+        _flush_file(eval_expr(self.file_expr, self.line, scope), self.line)
+
+class OpenFileStmt(Stmt):
+    """`open file <path> as <name>`: keep the file open for appending."""
+    __slots__ = ("file_expr", "var_name")
+
+    def __init__(self, line, file_expr, var_name):
+        self.line = line
+        self.file_expr = file_expr
+        self.var_name = var_name
+
+    def execute(self, scope):
+        file_path = eval_expr(self.file_expr, self.line, scope)
+        scope.assign(self.var_name, _open_file(file_path, self.line))
+
+class CloseFileStmt(Stmt):
+    __slots__ = ("var_name",)
+
+    def __init__(self, line, var_name):
+        self.line = line
+        self.var_name = var_name
+
+    def execute(self, scope):
+        _close_file(eval_expr(self.var_name, self.line, scope), self.line)
+
+class IfStmt(Stmt):
+    """`branches` is a list of (condition, line, body) for the if and each elif."""
+    __slots__ = ("branches", "else_body")
+
+    def __init__(self, line, branches, else_body):
+        self.line = line
+        self.branches = branches
+        self.else_body = else_body
+
+    def execute(self, scope):
+        for condition, line, body in self.branches:
+            if eval_expr(condition, line, scope):
+                exec_block(body, scope)
+                return
+        if self.else_body is not None:
+            exec_block(self.else_body, scope)
+
+class LoopStmt(Stmt):
+    __slots__ = ("count_expr", "body")
+
+    def __init__(self, line, count_expr, body):
+        self.line = line
+        self.count_expr = count_expr
+        self.body = body
+
+    def execute(self, scope):
+        count = int(eval_expr(self.count_expr, self.line, scope))
+        body = self.body
+        for loop_idx in range(count):
+            scope.assign('loop_index', loop_idx)
+            try:
+                exec_block(body, scope)
+            except Break:
+                break
+            except Continue:
+                continue
+
+class WhileStmt(Stmt):
+    __slots__ = ("condition", "body")
+
+    def __init__(self, line, condition, body):
+        self.line = line
+        self.condition = condition
+        self.body = body
+
+    def execute(self, scope):
+        condition = self.condition
+        body = self.body
+        while eval_expr(condition, self.line, scope):
+            try:
+                exec_block(body, scope)
+            except Break:
+                break
+            except Continue:
+                continue
+
+class ForEachStmt(Stmt):
+    """for each x in <expr>, or with `source` set, in <source> <path expr>
+    [with columns <columns_expr>]."""
+    __slots__ = ("var_name", "iterable_expr", "body", "source", "columns_expr")
+
+    def __init__(self, line, var_name, iterable_expr, body, source=None, columns_expr=None):
+        self.line = line
+        self.var_name = var_name
+        self.iterable_expr = iterable_expr
+        self.body = body
+        self.source = source
+        self.columns_expr = columns_expr
+
+    def iterable(self, scope):
+        iterable = eval_expr(self.iterable_expr, self.line, scope)
+        if self.source is not None:
+            if self.columns_expr is None:
+                iterable = _FILE_SOURCES[self.source](iterable, self.line)
+            else:
+                columns = eval_expr(self.columns_expr, self.line, scope)
+                iterable = _FILE_SOURCES[self.source](iterable, self.line, columns)
+        return iterable
+
+    def execute(self, scope):
+        iterable = self.iterable(scope)
+        var_name = self.var_name
+        body = self.body
+        try:
+            for item in iterable:
+                scope.assign(var_name, item)
+                try:
+                    exec_block(body, scope)
+                except Break:
+                    break
+                except Continue:
+                    continue
+        finally:
+            if isinstance(iterable, FileReader):
+                iterable.close()
+
+class ParallelForEachStmt(ForEachStmt):
+    """parallel for each x in <expr> [into <name>] [using <n> workers].
+
+    Each item's value is what the body returns for it (None without a
+    return); `into` collects them in order into a list. The body runs in a
+    pool of worker processes unless it could change state outside the loop,
+    in which case the items run one by one here, with the same results.
+    """
+    __slots__ = ("result_name", "workers_expr", "effects")
+
+    def __init__(self, line, var_name, iterable_expr, body, source=None, columns_expr=None,
+                 result_name=None, workers_expr=None):
+        super().__init__(line, var_name, iterable_expr, body, source, columns_expr)
+        self.result_name = result_name
+        self.workers_expr = workers_expr
+        self.effects = None
+
+    def execute(self, scope):
+        iterable = self.iterable(scope)
+        try:
+            items = list(iterable)
+        finally:
+            if isinstance(iterable, FileReader):
+                iterable.close()
+        if self.workers_expr is None:
+            workers = os.cpu_count() or 1
+        else:
+            workers = eval_expr(self.workers_expr, self.line, scope)
+            if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+                raise EzScriptError("parallel for each: workers must be a positive whole number", self.line)
+        results = None
+        if len(items) > 1 and workers > 1:
+            shared = _parallel_shared(self, scope)
+            if shared is not None:
+                results = _run_parallel(self, items, workers, *shared)
+        if results is None:
+            results = _run_items(self.var_name, self.body, scope, items)
+        if self.result_name is not None:
+            scope.assign(self.result_name, results)
+
+class TryStmt(Stmt):
+    __slots__ = ("body", "error_var", "handler")
+
+    def __init__(self, line, body, error_var, handler):
+        self.line = line
+        self.body = body
+        self.error_var = error_var
+        self.handler = handler
+
+    def execute(self, scope):
+        try:
+            exec_block(self.body, scope)
+        except (Return, Break, Continue):
+            raise
+        except Exception as e:
+            if self.error_var:
+                scope.assign(self.error_var, str(e))
+            exec_block(self.handler, scope)
+
+class ExprStmt(Stmt):
+    """A bare function or method call, optionally assigned with `let`."""
+    __slots__ = ("expr",)
+
+    def __init__(self, line, expr):
+        self.line = line
+        self.expr = expr
+
+    def execute(self, scope):
+        eval_expr(self.expr, self.line, scope)
+
+_AUG_OPS = ["+=", "-=", "*=", "/=", "//=", "%=", "**="]
+_AUG_OPERATORS = {
+    "+=": operator.iadd,
+    "-=": operator.isub,
+    "*=": operator.imul,
+    "/=": operator.itruediv,
+    "//=": operator.ifloordiv,
+    "%=": operator.imod,
+    "**=": operator.ipow,
+}
+# Longest operators first so "**=" and "//=" are not mistaken for "*=" and "/="
+_AUG_OPS_BY_LENGTH = ["**=", "//=", "+=", "-=", "*=", "/=", "%="]
+
+def _parse_condition(s, keyword_len):
+    """Strip the keyword and the trailing ':' or ' then' from a block header."""
+    if s.endswith(" then"):
+        return s[keyword_len:-5].strip()
+    return s[keyword_len:-1].strip()
+
+# "file <path>" and the other _FILE_SOURCES keywords after "for each x in"
+_FILE_SOURCE_RE = re.compile(r"(file|ndjson file|csv file)\s+([\"'\w(].*)$")
+# After "parallel for each": x in <expr> [into <name>] [using <expr> workers]
+_PARALLEL_RE = re.compile(r"([A-Za-z_]\w*) in (.+?)(?: into ([A-Za-z_]\w*))?(?: using (.+?) workers?)?$")
+
+def _split_source(iterable_expr):
+    """Split a for each iterable into (source, path or expression, columns)."""
+    m = _FILE_SOURCE_RE.match(iterable_expr)
+    if not m:
+        return None, iterable_expr, None
+    source, iterable_expr = m.group(1), m.group(2)
+    if source == 'csv file' and " with columns " in iterable_expr:
+        iterable_expr, columns_expr = iterable_expr.rsplit(" with columns ", 1)
+        return source, iterable_expr, columns_expr
+    return source, iterable_expr, None
+_AWAIT_RE = re.compile(r"let ([A-Za-z_]\w*) be await (.+)$")
+_SPAWN_RE = re.compile(r"spawn\s+([A-Za-z_][\w.]*)\s*\((.*)\)$")
+_SPAWN_ERROR = "spawn expects a function call: spawn name(arguments)"
+
+def _spawn_call(expr):
+    """Rewrite `spawn f(a, b)` as the builtin call `spawn(f, a, b)`, or None."""
+    m = _SPAWN_RE.match(expr)
+    if not m:
+        return None
+    args = m.group(2).strip()
+    return f"spawn({m.group(1)}, {args})" if args else f"spawn({m.group(1)})"
+
+_READ_FILE_RE = re.compile(r"let (.+?) be (?:read (json) |(map) |read )file (.+)$")
+# "json <expr>" or "csv <expr>" after write/append
+_FORMAT_RE = re.compile(r"(json|csv)\s+([\w\"'\[{(].*)$")
+
+def _split_format(content):
+    """Split "json data" into ("json", "data"); plain content has format None."""
+    m = _FORMAT_RE.match(content)
+    if m:
+        return m.group(1), m.group(2)
+    return None, content
+_OPEN_FILE_RE = re.compile(r"open file (.+) as ([A-Za-z_]\w*)$")
+_CLOSE_FILE_RE = re.compile(r"close ([A-Za-z_]\w*)$")
+
+def _parse_statement(lines, i, s, current_indent, loop_context):
+    """Parse the statement starting at lines[i] (stripped to `s`).
+
+    Returns (statement or None, index of the next line to parse).
+    """
+    line_no = i + 1
+
+    # Function definition; "memo function" caches results by arguments
+    memo = s.startswith("memo function ")
+    if (memo or s.startswith("function ")) and ("(" in s and ")" in s):
+        func_sig = s[14 if memo else 9:].strip()
+        if func_sig.endswith(":"):
+            func_sig = func_sig[:-1]
+
+        paren_idx = func_sig.index("(")
+        name = func_sig[:paren_idx].strip()
+        params_str = func_sig[paren_idx+1:func_sig.rindex(")")]
+
+        # Parse parameters with default values
+        params = []
+        default_exprs = {}
+        if params_str.strip():
+            for param in params_str.split(","):
+                param = param.strip()
+                if "=" in param:
+                    param_name, default_val = param.split("=", 1)
+                    param_name = param_name.strip()
+                    default_exprs[param_name] = default_val.strip()
+                    params.append(param_name)
+                else:
+                    params.append(param)
+
+        body_end = _find_block_end(lines, i + 1, current_indent)
+        body, _ = parse_block(lines, i + 1, current_indent + 4)
+        return FunctionDefStmt(line_no, name, params, default_exprs, body, memo), body_end
+
+    # RETURN (can return multiple values)
+    if s.startswith("return "):
+        expr = s[7:].strip()
+        if "," in expr:
+            return ReturnStmt(line_no, _split_top_level(expr)), i + 1
+        return ReturnStmt(line_no, [expr]), i + 1
+    if s == "return":
+        return ReturnStmt(line_no, None), i + 1
+
+    if s == "break":
+        if not loop_context:
+            return ErrorStmt(line_no, "'break' can only be used inside a loop"), i + 1
+        return BreakStmt(line_no), i + 1
+
+    if s == "continue":
+        if not loop_context:
+            return ErrorStmt(line_no, "'continue' can only be used inside a loop"), i + 1
+        return ContinueStmt(line_no), i + 1
+
+    # THROW (raise an error)
+    if s.startswith("throw "):
+        return ThrowStmt(line_no, s[6:]), i + 1
+
+    # READ FILE (check before general LET assignment)
+    m = _READ_FILE_RE.match(s)
+    if m:
+        return ReadFileStmt(line_no, m.group(1).strip(), m.group(4).strip(), m.group(2) or m.group(3)), i + 1
+
+    # AWAIT a task, optionally keeping its result
+    m = _AWAIT_RE.match(s)
+    if m or s.startswith("await "):
+        var_name, expr = (m.group(1), m.group(2).strip()) if m else (None, s[6:].strip())
+        if expr.startswith("spawn "):
+            expr = _spawn_call(expr)
+            if expr is None:
+                return ErrorStmt(line_no, _SPAWN_ERROR), i + 1
+        return AwaitStmt(line_no, var_name, expr), i + 1
+
+    # SPAWN a task without keeping its handle
+    if s.startswith("spawn "):
+        expr = _spawn_call(s)
+        if expr is None:
+            return ErrorStmt(line_no, _SPAWN_ERROR), i + 1
+        return ExprStmt(line_no, expr), i + 1
+
+    # LET assignment (supports multiple variables and unpacking)
+    if s.startswith("let ") and " be " in s:
+        parts = s.split(" be ", 1)
+        vars_part = parts[0][4:].strip()
+        expr = parts[1].strip()
+        if expr.startswith("spawn "):
+            expr = _spawn_call(expr)
+            if expr is None:
+                return ErrorStmt(line_no, _SPAWN_ERROR), i + 1
+
+        if "," in vars_part:
+            var_names = [v.strip() for v in vars_part.split(",")]
+            return MultiLetStmt(line_no, var_names, expr), i + 1
+
+        # Dict and list literals may continue over several lines
+        if expr.startswith("{") or expr.startswith("["):
+            depth = expr.count("{") + expr.count("[") - expr.count("}") - expr.count("]")
+            while depth > 0:
+                i += 1
+                if i >= len(lines):
+                    return ErrorStmt(i + 1, "list index out of range"), i
+                next_line = lines[i].rstrip()
+                expr += "\n" + next_line
+                depth += next_line.count("{") + next_line.count("[")
+                depth -= next_line.count("}") + next_line.count("]")
+        return LetStmt(i + 1, vars_part, expr), i + 1
+
+    # Augmented assignment
+    if any(op in s for op in _AUG_OPS):
+        for op in _AUG_OPS_BY_LENGTH:
+            if op in s:
+                var, expr = s.split(op, 1)
+                return AugAssignStmt(line_no, var.strip(), op, expr.strip()), i + 1
+
+    if s.startswith("print ") and not s.startswith("print("):
+        return ErrorStmt(line_no, "print requires parentheses: use print(...) instead of print ..."), i + 1
+
+    # Print
+    if s.startswith("print("):
+        if not s.endswith(")"):
+            return ErrorStmt(line_no, "Missing closing parenthesis in print statement"), i + 1
+        expr = s[s.index("(")+1:-1].strip()
+        return PrintStmt(line_no, _split_top_level(expr)), i + 1
+
+    # Wait/Sleep
+    if s.startswith("wait ") and ("second" in s or "seconds" in s):
+        time_expr = s[5:].replace("seconds", "").replace("second", "").strip()
+        return WaitStmt(line_no, time_expr), i + 1
+
+    # WRITE FILE
+    if s.startswith("write ") and " to file " in s:
+        parts = s.split(" to file ", 1)
+        format, content = _split_format(parts[0][6:].strip())
+        return WriteFileStmt(line_no, content, parts[1].strip(), 'w', format), i + 1
+
+    # APPEND FILE
+    if s.startswith("append ") and " to file " in s:
+        parts = s.split(" to file ", 1)
+        format, content = _split_format(parts[0][7:].strip())
+        return WriteFileStmt(line_no, content, parts[1].strip(), 'a', format), i + 1
+
+    # FLUSH / OPEN / CLOSE FILE
+    if s.startswith("flush file "):
+        return FlushFileStmt(line_no, s[11:].strip()), i + 1
+
+    m = _OPEN_FILE_RE.match(s)
+    if m:
+        return OpenFileStmt(line_no, m.group(1).strip(), m.group(2)), i + 1
+
+    m = _CLOSE_FILE_RE.match(s)
+    if m:
+        return CloseFileStmt(line_no, m.group(1)), i + 1
+
+    # IF / ELIF / ELSE
+    if s.startswith("if ") and (s.endswith(" then") or s.endswith(":")):
+        branches = []
+        else_body = None
+        condition = _parse_condition(s, 3)
+        block_end = _find_block_end(lines, i + 1, current_indent)
+        body, _ = parse_block(lines, i + 1, current_indent + 4, loop_context)
+        branches.append((condition, line_no, body))
+
+        i = block_end
+        while i < len(lines):
+            next_line = strip_inline_comment(lines[i]).strip()
+            if _indent_of(lines[i]) != current_indent:
+                break
+
+            if next_line.startswith("elif ") and (next_line.endswith(" then") or next_line.endswith(":")):
+                condition = _parse_condition(next_line, 5)
+                block_end = _find_block_end(lines, i + 1, current_indent)
+                body, _ = parse_block(lines, i + 1, current_indent + 4, loop_context)
+                branches.append((condition, i + 1, body))
+                i = block_end
+            elif next_line == "else" or next_line == "else:":
+                block_end = _find_block_end(lines, i + 1, current_indent)
+                else_body, _ = parse_block(lines, i + 1, current_indent + 4, loop_context)
+                i = block_end
+                break
+            else:
+                break
+
+        return IfStmt(line_no, branches, else_body), i
+
+    # LOOP (repeat N times)
+    if s.startswith("loop ") and s.endswith(" times:"):
+        count_expr = s[5:-7].strip()
+        body_end = _find_block_end(lines, i + 1, current_indent)
+        body, _ = parse_block(lines, i + 1, current_indent + 4, loop_context=True)
+        return LoopStmt(line_no, count_expr, body), body_end
+
+    # WHILE loop
+    if s.startswith("while ") and (s.endswith(":") or s.endswith(" then")):
+        condition = _parse_condition(s, 6)
+        body_end = _find_block_end(lines, i + 1, current_indent)
+        body, _ = parse_block(lines, i + 1, current_indent + 4, loop_context=True)
+        return WhileStmt(line_no, condition, body), body_end
+
+    # FOR EACH loop
+    if s.startswith("for each ") and " in " in s and (s.endswith(":") or s.endswith(" then")):
+        parts = _parse_condition(s, 9).split(" in ", 1)
+        var_name = parts[0].strip()
+        source, iterable_expr, columns_expr = _split_source(parts[1].strip())
+        body_end = _find_block_end(lines, i + 1, current_indent)
+        body, _ = parse_block(lines, i + 1, current_indent + 4, loop_context=True)
+        return ForEachStmt(line_no, var_name, iterable_expr, body, source, columns_expr), body_end
+
+    # PARALLEL FOR EACH: the body runs in worker processes
+    if s.startswith("parallel for each ") and (s.endswith(":") or s.endswith(" then")):
+        body_end = _find_block_end(lines, i + 1, current_indent)
+        m = _PARALLEL_RE.match(_parse_condition(s, 18))
+        if not m:
+            return ErrorStmt(line_no, "Expected: parallel for each <name> in <list> "
+                                      "[into <name>] [using <n> workers]:"), body_end
+        var_name, iterable_expr, result_name, workers_expr = m.groups()
+        source, iterable_expr, columns_expr = _split_source(iterable_expr)
+        body, _ = parse_block(lines, i + 1, current_indent + 4, loop_context=True)
+        return ParallelForEachStmt(line_no, var_name, iterable_expr, body, source, columns_expr,
+                                   result_name, workers_expr), body_end
+
+    # TRY-CATCH error handling
+    if s == "try:":
+        try_end = _find_block_end(lines, i + 1, current_indent)
+        body, _ = parse_block(lines, i + 1, current_indent + 4, loop_context)
+
+        if not (try_end < len(lines) and lines[try_end].strip().startswith("catch")):
+            return ErrorStmt(line_no, "try block must have a catch block"), try_end
+
+        catch_line = lines[try_end].strip()
+        if catch_line == "catch:":
+            error_var = None
+        elif catch_line.startswith("catch ") and catch_line.endswith(":"):
+            error_var = catch_line[6:-1].strip()
+        else:
+            return ErrorStmt(try_end + 1, "Invalid catch syntax"), try_end + 1
+
+        catch_end = _find_block_end(lines, try_end + 1, current_indent)
+        handler, _ = parse_block(lines, try_end + 1, current_indent + 4, loop_context)
+        return TryStmt(line_no, body, error_var, handler), catch_end
+
+    # Function and method calls (with or without assignment)
+    if "(" in s and ")" in s:
+        return ExprStmt(line_no, s), i + 1
+
+    return None, i + 1
+
+def parse_block(lines, start, indent, loop_context=False):
+    """Parse statements from `start` until a line is indented less than `indent`.
+
+    Returns (statements, index of the first line that was not consumed).
+    """
+    stmts = []
+    i = start
+    while i < len(lines):
+        line = lines[i]
+
+        # Skip empty lines and comments
+        if not line.strip() or is_comment(line):
+            i += 1
+            continue
+
+        # Strip inline comments
+        line = strip_inline_comment(line)
+
+        # Skip if line became empty after stripping comment
+        if not line.strip():
+            i += 1
+            continue
+
+        current_indent = _indent_of(line)
+        if current_indent < indent:
+            return stmts, i
+
+        stmt, i = _parse_statement(lines, i, line.strip(), current_indent, loop_context)
+        if stmt is not None:
+            stmts.append(stmt)
+
+    return stmts, i
+
+def parse_program(lines):
+    """Parse a whole EzScript source (a list of lines) into a statement list."""
+    stmts, _ = parse_block(lines, 0, 0)
+    return stmts
+
+# ==========================
+# Executor
+# ==========================
+
+def exec_block(stmts, scope):
+    """Execute parsed statements, attaching line numbers to errors."""
+    if _profiling:
+        profiler = _current().profiler
+        if profiler is not None:
+            return _exec_block_profiled(profiler, stmts, scope)
+    _exec_stmts(stmts, scope)
+
+def _exec_stmts(stmts, scope):
+    for stmt in stmts:
+        try:
+            stmt.execute(scope)
+        except (Return, Break, Continue):
+            raise
+        except EzScriptError as e:
+            if e.line_number is None:
+                e.line_number = stmt.line
+            raise
+        except RecursionError:
+            # Formatting the error could run out of stack again
+            raise EzScriptError(RECURSION_MESSAGE, stmt.line) from None
+        except Exception as e:
+            raise EzScriptError(str(e), stmt.line)
+
+def local_names(stmts):
+    """Names a block binds as variables, not counting nested functions."""
+    names = set()
+    for stmt in stmts:
+        if isinstance(stmt, (LetStmt, ReadFileStmt, OpenFileStmt)):
+            names.add(stmt.var_name)
+        elif isinstance(stmt, AwaitStmt) and stmt.var_name:
+            names.add(stmt.var_name)
+        elif isinstance(stmt, MultiLetStmt):
+            names.update(stmt.var_names)
+        elif isinstance(stmt, IfStmt):
+            for _, _, body in stmt.branches:
+                names |= local_names(body)
+            if stmt.else_body is not None:
+                names |= local_names(stmt.else_body)
+        elif isinstance(stmt, LoopStmt):
+            names.add('loop_index')
+            names |= local_names(stmt.body)
+        elif isinstance(stmt, ForEachStmt):
+            names.add(stmt.var_name)
+            if isinstance(stmt, ParallelForEachStmt) and stmt.result_name:
+                names.add(stmt.result_name)
+            names |= local_names(stmt.body)
+        elif isinstance(stmt, WhileStmt):
+            names |= local_names(stmt.body)
+        elif isinstance(stmt, TryStmt):
+            if stmt.error_var:
+                names.add(stmt.error_var)
+            names |= local_names(stmt.body)
+            names |= local_names(stmt.handler)
+    return names
+
+class EzFunction:
+    """A user-defined function. Each call runs in a fresh slot-based Scope.
+
+    Lookups that miss the local slots fall through to the locals of the
+    enclosing call (for a function defined inside another one) and then to
+    the global variables, so a call costs the same however much global state
+    the script has.
+    """
+    __slots__ = ("name", "params", "defaults", "body", "slot_index", "globals", "functions", "builtins",
+                 "enclosing")
+
+    def __init__(self, definition, defaults, globals, functions, builtins=BUILTINS, enclosing=None):
+        self.name = definition.name
+        self.params = definition.params
+        self.defaults = defaults
+        self.body = definition.body
+        self.slot_index = definition.slot_index
+        self.globals = globals
+        self.functions = functions
+        self.builtins = builtins
+        self.enclosing = enclosing
+
+    def __call__(self, *args, **kwargs):
+        if _profiling:
+            profiler = _current().profiler
+            if profiler is not None:
+                return _ezfunction_call_profiled(profiler, self, args, kwargs)
+        return self._call(args, kwargs)
+
+    def _call(self, args, kwargs):
+        params = self.params
+        slots = [_UNBOUND] * len(self.slot_index)
+
+        # Handle positional arguments
+        for idx, a in zip(range(len(params)), args):
+            slots[idx] = a
+
+        # Handle remaining parameters with defaults
+        for idx in range(len(args), len(params)):
+            param = params[idx]
+            if param in kwargs:
+                slots[idx] = kwargs[param]
+            elif param in self.defaults:
+                slots[idx] = self.defaults[param]
+            else:
+                raise EzScriptError(f"Missing required parameter: {param}")
+
+        try:
+            exec_block(self.body, Scope(self.globals, self.functions, self.slot_index, slots, self.builtins,
+                                        self.enclosing))
+        except Return as r:
+            return r.value
+        return None
+
+    def __repr__(self):
+        return f"<function {self.name}>"
+
+
+def run_block(lines, start, indent, loop_context=False):
+    """Parse and execute a block of code; returns the index where it ended."""
+    stmts, end = parse_block(lines, start, indent, loop_context)
+    exec_block(stmts, _current().scope)
+    return end
+
+# ==========================
+# Parallel for each
+# ==========================
+# A parallel loop body goes to worker processes only when running it there
+# gives the same result as running it here: it must not print, write files,
+# use the window or keyboard, break, or change variables, lists or dicts
+# that exist outside the loop, and neither may the functions it calls.
+# Workers get the loop body, those functions and the variables they read.
+
+# Statements that keep a loop body in this process, and why
+_SERIAL_STMTS = {
+    PrintStmt: "prints",
+    WriteFileStmt: "writes a file",
+    FlushFileStmt: "writes a file",
+    OpenFileStmt: "opens a file",
+    CloseFileStmt: "closes a file",
+    BreakStmt: "uses break",
+    FunctionDefStmt: "defines a function",
+}
+
+# Builtins with effects outside the loop: the window API, input and shuffle
+_PARALLEL_UNSAFE = frozenset(
+    [name for name, function in BUILTINS.items()
+     if getattr(function, "__name__", "").startswith("_api_")]
+    + ['input', 'shuffle'])
+
+# Methods that change a list, dict or set in place
+_MUTATING_METHODS = frozenset([
+    "append", "extend", "insert", "pop", "remove", "clear", "sort", "reverse",
+    "update", "setdefault", "popitem", "add", "discard",
+])
+
+class _AnyName:
+    """Stands in for bound_names so every {placeholder} reads a variable."""
+
+    def __contains__(self, name):
+        return True
+
+def _stmt_exprs(stmt):
+    """The expressions a statement evaluates itself, not those in its body."""
+    if isinstance(stmt, IfStmt):
+        return [condition for condition, _, _ in stmt.branches]
+    if isinstance(stmt, ReturnStmt):
+        return stmt.exprs or []
+    if isinstance(stmt, PrintStmt):
+        return stmt.parts
+    if isinstance(stmt, FunctionDefStmt):
+        return list(stmt.default_exprs.values())
+    if isinstance(stmt, CloseFileStmt):
+        return [stmt.var_name]
+    exprs = []
+    for slot in ("expr", "condition", "count_expr", "iterable_expr", "columns_expr",
+                 "workers_expr", "content_expr", "file_expr"):
+        expr = getattr(stmt, slot, None)
+        if expr is not None:
+            exprs.append(expr)
+    return exprs
+
+def _block_effects(stmts):
+    """What a block does, as (reason, reads, writes, mutated).
+
+    `reason` says why the block cannot run in a worker, or is None.
+    `reads` are the names its expressions use, `writes` the variables it
+    assigns and `mutated` the variables whose list, dict or set it changes.
+    """
+    _import_ast()
+    reads, writes, mutated = set(), set(), set()
+    for stmt in _walk_stmts(stmts):
+        reason = _SERIAL_STMTS.get(type(stmt))
+        if reason:
+            return reason, reads, writes, mutated
+        if isinstance(stmt, AugAssignStmt):
+            reads.add(stmt.var_name)
+            writes.add(stmt.var_name)
+        for expr in _stmt_exprs(stmt):
+            tree = _expr_ast_unlined(expr, stmt.line, _AnyName())
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Name):
+                    reads.add(node.id)
+                elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                        and node.func.attr in _MUTATING_METHODS):
+                    target = node.func.value
+                    while isinstance(target, (ast.Attribute, ast.Subscript)):
+                        target = target.value
+                    if not isinstance(target, ast.Name):
+                        return "changes a value in place", reads, writes, mutated
+                    mutated.add(target.id)
+    writes |= local_names(stmts)
+    unsafe = reads & _PARALLEL_UNSAFE
+    if unsafe:
+        return f"calls {min(unsafe)}", reads, writes, mutated
+    return None, reads, writes, mutated
+
+def _parallel_shared(stmt, scope):
+    """The (variables, functions) a parallel loop's workers need, or None if
+    the body must run in this process."""
+    if stmt.effects is None:
+        stmt.effects = _block_effects(stmt.body)
+    reason, reads, writes, mutated = stmt.effects
+    if reason:
+        return None
+
+    def bound(name):
+        try:
+            scope.lookup_var(name)
+        except KeyError:
+            return name in scope.functions
+        return True
+
+    # Names the body assigns must be its own temporaries, and it may only
+    # change lists it built itself
+    if any(bound(name) for name in writes):
+        return None
+    if mutated - (writes - {stmt.var_name}):
+        return None
+
+    variables, functions = {}, {}
+    pending = list(reads - writes)
+    while pending:
+        name = pending.pop()
+        if name in variables or name in functions:
+            continue
+        try:
+            variables[name] = scope.lookup_var(name)
+            continue
+        except KeyError:
+            pass
+        function = scope.functions.get(name)
+        if isinstance(function, EzMemo):
+            # Workers run the function itself; its cache stays here
+            function = function.function
+        if not isinstance(function, EzFunction):
+            continue
+        if function.enclosing is not None:
+            # Workers only get the definition, not the call it closes over
+            return None
+        reason, function_reads, function_writes, function_mutated = _block_effects(function.body)
+        local = set(function.slot_index)
+        if reason or function_writes - local or function_mutated - (local - set(function.params)):
+            return None
+        functions[name] = function
+        pending.extend(function_reads - local)
+    return variables, functions
+
+def _run_items(var_name, body, scope, items):
+    """Run a parallel loop body for each item here; return the values."""
+    results = []
+    for item in items:
+        scope.assign(var_name, item)
+        try:
+            exec_block(body, scope)
+        except Return as r:
+            results.append(r.value)
+            continue
+        except Continue:
+            pass
+        except Break:
+            break
+        results.append(None)
+    return results
+
+def _refuse_function(function):
+    import pickle
+    raise pickle.PicklingError("function values are not sent to workers")
+
+def _parallel_dumps(value):
+    """Pickle `value` for the workers, refusing EzFunction values: only
+    functions _parallel_shared checked may reach a worker, and those are
+    sent as their definitions."""
+    import copyreg
+    import pickle
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = {**copyreg.dispatch_table, EzFunction: _refuse_function}
+    pickler.dump(value)
+    return buffer.getvalue()
+
+_parallel_keys = count()
+
+# In a worker: (key, EzInterpreter, var_name, body) of the last loop it ran
+_parallel_worker_state = None
+
+def _parallel_worker_init():
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), RECURSION_LIMIT))
+
+def _parallel_chunk(task):
+    """Worker side: run the loop body for one pickled chunk of items."""
+    import pickle
+    global _parallel_worker_state
+    key, payload, chunk = task
+    state = _parallel_worker_state
+    if state is None or state[0] != key:
+        interpreter = EzInterpreter()
+        var_name, body, variables, definitions = pickle.loads(payload)
+        interpreter.variables.update(variables)
+        for name, (params, defaults, function_body, slot_index) in definitions.items():
+            function = EzFunction.__new__(EzFunction)
+            function.name = name
+            function.params = params
+            function.defaults = defaults
+            function.body = function_body
+            function.slot_index = slot_index
+            function.globals = interpreter.variables
+            function.functions = interpreter.functions
+            function.builtins = interpreter.builtins
+            function.enclosing = None
+            interpreter.functions[name] = function
+        state = _parallel_worker_state = (key, interpreter, var_name, body)
+    _, interpreter, var_name, body = state
+    with interpreter._activated():
+        try:
+            results = _run_items(var_name, body, interpreter.scope, pickle.loads(chunk))
+        except Exception as e:
+            e = _translate_error(e)
+            return "error", e.message, e.line_number
+        try:
+            return "ok", _parallel_dumps(results), None
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return "unpicklable", None, None
+
+def _run_parallel(stmt, items, workers, variables, functions):
+    """Run a parallel loop on the interpreter's process pool.
+
+    Returns the values in item order, or None when the loop has to run in
+    this process instead: its data cannot be pickled, or this process is
+    itself a pool worker. Results that cannot be sent back are an error,
+    as running the body again here would repeat what the workers did.
+    """
+    import multiprocessing
+    import pickle
+    if multiprocessing.current_process().daemon:
+        return None
+    definitions = {name: (f.params, f.defaults, f.body, f.slot_index) for name, f in functions.items()}
+    try:
+        payload = _parallel_dumps((stmt.var_name, stmt.body, variables, definitions))
+        size = -(-len(items) // (workers * 4))
+        chunks = [_parallel_dumps(items[i:i + size]) for i in range(0, len(items), size)]
+    except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+        return None
+    ez = _current()
+    # Workers read files from disk, so they must see what this process wrote
+    try:
+        ez.files.flush_all()
+    except OSError as e:
+        raise EzScriptError(f"Cannot flush files before the parallel loop: {e}", stmt.line)
+    key = next(_parallel_keys)
+    outcomes = ez.process_pool(workers).map(
+        _parallel_chunk, [(key, payload, chunk) for chunk in chunks], chunksize=1)
+    results = []
+    for status, value, line in outcomes:
+        if status == "error":
+            raise EzScriptError(value, line or stmt.line)
+        if status == "unpicklable":
+            raise EzScriptError("parallel for each: the loop body must return plain values "
+                                "(numbers, text, lists, dictionaries), not functions, files or images", stmt.line)
+        results.extend(pickle.loads(value))
+    return results
+
+# ==========================
+# Profiler (--profile)
+# ==========================
+
+class Profiler:
+    """Per-line and per-function timings for one script run.
+
+    An EzInterpreter with a profiler set runs exec_block and EzFunction
+    calls through the timed versions below; other interpreters, even in
+    the same process, are not timed.
+    Self time excludes nested statements (for lines) or nested EzScript
+    calls (for functions). Cumulative time counts only the outermost
+    activation, so recursion is not counted twice.
+    """
+
+    def __init__(self):
+        self.lines = {}       # line -> [hits, cumulative, self]
+        self.functions = {}   # name -> [calls, cumulative, self]
+        self.total = 0.0
+        self._line_children = []
+        self._func_children = []
+        self._active = {}
+
+    def _record(self, table, children, key, elapsed):
+        child_time = children.pop()
+        active_key = (table is self.lines, key)
+        active = self._active[active_key] - 1
+        self._active[active_key] = active
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = [0, 0.0, 0.0]
+        stats[0] += 1
+        if not active:
+            stats[1] += elapsed
+        stats[2] += elapsed - child_time
+        if children:
+            children[-1] += elapsed
+
+    def _enter(self, table, children, key):
+        children.append(0.0)
+        active_key = (table is self.lines, key)
+        self._active[active_key] = self._active.get(active_key, 0) + 1
+
+    def report(self, source_lines, script):
+        """The text report: lines and functions sorted by self time."""
+        total = self.total or 1e-12
+        out = [f"EzScript profile for {script}",
+               f"Total time: {self.total * 1000:.3f} ms", "",
+               f"{'Line':>6} {'Hits':>10} {'Self ms':>11} {'Cum ms':>11} {'Self %':>7}  Source"]
+        for line, (hits, cumulative, self_time) in sorted(self.lines.items(), key=lambda item: -item[1][2]):
+            source = source_lines[line - 1].strip() if 0 < line <= len(source_lines) else ""
+            out.append(f"{line:>6} {hits:>10} {self_time * 1000:>11.3f} {cumulative * 1000:>11.3f} "
+                       f"{100 * self_time / total:>6.1f}%  {source}")
+        if self.functions:
+            out += ["", f"{'Function':<24} {'Calls':>10} {'Self ms':>11} {'Cum ms':>11}"]
+            for name, (calls, cumulative, self_time) in sorted(self.functions.items(), key=lambda item: -item[1][2]):
+                out.append(f"{name:<24} {calls:>10} {self_time * 1000:>11.3f} {cumulative * 1000:>11.3f}")
+        return "\n".join(out) + "\n"
+
+    def to_json(self, source_lines, script):
+        def source(line):
+            return source_lines[line - 1].strip() if 0 < line <= len(source_lines) else ""
+        return {
+            "script": script,
+            "total_seconds": self.total,
+            "lines": [
+                {"line": line, "hits": hits, "self_seconds": self_time,
+                 "cumulative_seconds": cumulative, "source": source(line)}
+                for line, (hits, cumulative, self_time)
+                in sorted(self.lines.items(), key=lambda item: -item[1][2])
+            ],
+            "functions": [
+                {"name": name, "calls": calls, "self_seconds": self_time, "cumulative_seconds": cumulative}
+                for name, (calls, cumulative, self_time)
+                in sorted(self.functions.items(), key=lambda item: -item[1][2])
+            ],
+        }
+
+    def write_reports(self, prefix, source_lines, script):
+        """Write <prefix>.profile.txt and <prefix>.profile.json."""
+        with open(f"{prefix}.profile.txt", "w") as f:
+            f.write(self.report(source_lines, script))
+        with open(f"{prefix}.profile.json", "w") as f:
+            json.dump(self.to_json(source_lines, script), f, indent=2)
+
+# Number of interpreters with a profiler set; while it is 0, exec_block and
+# function calls skip looking up the current interpreter
+_profiling = 0
+_profiling_lock = threading.Lock()
+
+def _exec_block_profiled(profiler, stmts, scope):
+    lines = profiler.lines
+    children = profiler._line_children
+    for stmt in stmts:
+        profiler._enter(lines, children, stmt.line)
+        start = time.perf_counter()
+        try:
+            _exec_stmts((stmt,), scope)
+        finally:
+            profiler._record(lines, children, stmt.line, time.perf_counter() - start)
+
+def _ezfunction_call_profiled(profiler, function, args, kwargs):
+    functions_table = profiler.functions
+    children = profiler._func_children
+    profiler._enter(functions_table, children, function.name)
+    start = time.perf_counter()
+    try:
+        return function._call(args, kwargs)
+    finally:
+        profiler._record(functions_table, children, function.name, time.perf_counter() - start)
+
+def start_profiling(interpreter, profiler):
+    """Time what `interpreter` runs from now on with `profiler`."""
+    global _profiling
+    with _profiling_lock:
+        if interpreter.profiler is None:
+            _profiling += 1
+        interpreter.profiler = profiler
+
+def stop_profiling(interpreter):
+    global _profiling
+    with _profiling_lock:
+        if interpreter.profiler is not None:
+            _profiling -= 1
+        interpreter.profiler = None
+
+# ==========================
+# Compiler: statement tree -> Python code object
+# ==========================
+
+# Bump when the generated code changes so stale __ezcache__ entries are ignored
+_COMPILER_VERSION = 9
+
+# Directory, next to each script, that holds compiled scripts
+EZCACHE_DIR = "__ezcache__"
+
+class CompileUnsupported(Exception):
+    """The program uses a statement the compiler cannot translate."""
+
+def _ez_raise(message, line_num):
+    raise EzScriptError(message, line_num)
+
+def _ez_loop_count(value, line_num):
+    try:
+        return int(value)
+    except Exception as e:
+        raise EzScriptError(str(e), line_num)
+
+def _ez_sleep(seconds, line_num):
+    try:
+        seconds = float(seconds)
+    except Exception as e:
+        raise EzScriptError(str(e), line_num)
+    _current().wait(seconds)
+
+def _ez_catch_message(e):
+    """The text a `catch name:` variable receives for an exception."""
+    return _translate_error(e).message
+
+# Names the generated code can reach besides the script's own globals
+_COMPILED_BUILTINS = {
+    **BUILTINS,
+    '_ez_print': _print_values,
+    '_ez_read_file': _read_file,
+    '_ez_file_sources': _FILE_SOURCES,
+    '_ez_write_file': _write_file,
+    '_ez_flush_file': _flush_file,
+    '_ez_open_file': _open_file,
+    '_ez_close_file': _close_file,
+    '_ez_unpack': _unpack,
+    '_ez_sleep': _ez_sleep,
+    '_ez_await': _await_task,
+    '_ez_memo': EzMemo,
+    '_ez_loop_count': _ez_loop_count,
+    '_ez_raise': _ez_raise,
+    '_ez_catch_message': _ez_catch_message,
+    '_ez_Return': Return,
+    '_ez_signals': (Return, Break, Continue),
+    '_ez_Exception': Exception,
+}
+
+def _set_line(node, line):
+    """Give every node of an expression tree the source line `line`."""
+    for child in ast.walk(node):
+        if 'lineno' in child._attributes:
+            child.lineno = child.end_lineno = line
+            child.col_offset = child.end_col_offset = 0
+    return node
+
+def _name(name, ctx=None):
+    return ast.Name(id=name, ctx=ctx or ast.Load())
+
+def _call(func_name, *args):
+    return ast.Call(func=_name(func_name), args=list(args), keywords=[])
+
+def _raise_call(message, line):
+    """An expression that raises EzScriptError when evaluated."""
+    return _call('_ez_raise', ast.Constant(message), ast.Constant(line))
+
+def _expr_ast(expr, line, bound_names):
+    """Python AST for an EzScript expression, following _compile_expr's rules.
+
+    Expressions that do not compile become a call that raises the same
+    error at run time, so a bad line only fails if it is reached.
+    `bound_names` holds every variable name the program can ever assign.
+    """
+    return _set_line(_expr_ast_unlined(expr, line, bound_names), line)
+
+def _expr_ast_unlined(expr, line, bound_names):
+    expr = expr.strip()
+    try:
+        return ast.Constant(int(expr))
+    except ValueError:
+        pass
+    try:
+        return ast.Constant(float(expr))
+    except ValueError:
+        pass
+
+    if _is_string_literal(expr):
+        string_content = expr[1:-1]
+        if '{' in string_content and '}' in string_content:
+            return _template_ast(_compile_template(string_content), line, bound_names)
+        return ast.Constant(_process_escapes(string_content))
+
+    if expr.startswith("{") and expr.endswith("}"):
+        keys = []
+        values = []
+        for part in _split_top_level(expr[1:-1].strip()):
+            if ":" not in part:
+                return _raise_call(f"Invalid dictionary item: {part}", line)
+            k, v = part.split(":", 1)
+            keys.append(_expr_ast_unlined(k, line, bound_names))
+            values.append(_expr_ast_unlined(v, line, bound_names))
+        return ast.Dict(keys=keys, values=values)
+
+    source = _translate_expr(expr)
+    if source == "true":
+        return ast.Constant(True)
+    if source == "false":
+        return ast.Constant(False)
+    try:
+        return ast.parse(source, filename="<string>", mode="eval").body
+    except SyntaxError as e:
+        return _raise_call(f"Syntax error in expression: {e}", line)
+    except Exception as e:
+        return _raise_call(f"Invalid expression: {e}", line)
+
+def _template_ast(template, line, bound_names):
+    """An f-string equivalent of a Template.
+
+    A {name} the program never assigns stays in the text, as in the
+    interpreter; one that is assigned somewhere but not yet bound when the
+    string is built raises an error instead.
+    """
+    values = []
+    for segment in template.segments:
+        if segment.__class__ is str:
+            values.append(ast.Constant(segment))
+            continue
+        name, _, raw = segment
+        if name is not None and name not in bound_names:
+            values.append(ast.Constant(raw))
+            continue
+        value = _name(name) if name is not None else _expr_ast_unlined(raw[1:-1], line, bound_names)
+        values.append(ast.FormattedValue(value=value, conversion=-1, format_spec=None))
+    return ast.JoinedStr(values=values)
+
+def _bound_names(stmts):
+    """Every variable name a program can assign, including in functions."""
+    names = local_names(stmts)
+    for stmt in _walk_stmts(stmts):
+        if isinstance(stmt, FunctionDefStmt):
+            names.update(stmt.slot_index)
+    return names
+
+def _walk_stmts(stmts):
+    """Yield every statement in a tree, including nested blocks."""
+    for stmt in stmts:
+        yield stmt
+        if isinstance(stmt, IfStmt):
+            for _, _, body in stmt.branches:
+                yield from _walk_stmts(body)
+            if stmt.else_body is not None:
+                yield from _walk_stmts(stmt.else_body)
+        elif isinstance(stmt, (LoopStmt, WhileStmt, ForEachStmt, FunctionDefStmt)):
+            yield from _walk_stmts(stmt.body)
+        elif isinstance(stmt, TryStmt):
+            yield from _walk_stmts(stmt.body)
+            yield from _walk_stmts(stmt.handler)
+
+def _global_names(stmts):
+    """Names a function body must declare global: updated globals and
+    nested function definitions, which the interpreter also makes global."""
+    names = set()
+    for stmt in stmts:
+        if isinstance(stmt, AugAssignStmt):
+            names.add(stmt.var_name)
+        elif isinstance(stmt, FunctionDefStmt):
+            names.add(stmt.name)
+        elif isinstance(stmt, IfStmt):
+            for _, _, body in stmt.branches:
+                names |= _global_names(body)
+            if stmt.else_body is not None:
+                names |= _global_names(stmt.else_body)
+        elif isinstance(stmt, (LoopStmt, WhileStmt, ForEachStmt)):
+            names |= _global_names(stmt.body)
+        elif isinstance(stmt, TryStmt):
+            names |= _global_names(stmt.body)
+            names |= _global_names(stmt.handler)
+    return names
+
+def _names_read(expr, line):
+    tree = _expr_ast_unlined(expr, line, _AnyName())
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+def _read_before_set(stmts, assigned, local):
+    """Names in `local` that a function body may read before it sets them.
+
+    `assigned` holds the names already set on entry; it grows with the
+    block's own assignments. Names set inside an if, loop or try count as
+    set only within that block.
+    """
+    early = set()
+    for stmt in stmts:
+        for expr in _stmt_exprs(stmt):
+            early |= _names_read(expr, stmt.line) & local - assigned
+        if isinstance(stmt, AugAssignStmt) and stmt.var_name in local - assigned:
+            early.add(stmt.var_name)
+        if isinstance(stmt, IfStmt):
+            for _, _, body in stmt.branches:
+                early |= _read_before_set(body, set(assigned), local)
+            if stmt.else_body is not None:
+                early |= _read_before_set(stmt.else_body, set(assigned), local)
+        elif isinstance(stmt, LoopStmt):
+            early |= _read_before_set(stmt.body, assigned | {'loop_index'}, local)
+        elif isinstance(stmt, ForEachStmt):
+            early |= _read_before_set(stmt.body, assigned | {stmt.var_name}, local)
+        elif isinstance(stmt, WhileStmt):
+            early |= _read_before_set(stmt.body, set(assigned), local)
+        elif isinstance(stmt, TryStmt):
+            early |= _read_before_set(stmt.body, set(assigned), local)
+            early |= _read_before_set(stmt.handler, assigned | {stmt.error_var}, local)
+        elif not isinstance(stmt, FunctionDefStmt):
+            assigned |= local_names([stmt])
+    return early
+
+class _Compiler:
+    """Translates parsed statements into a Python module AST."""
+
+    def __init__(self, bound_names):
+        self.in_function = False
+        # Local variables of the functions around the one being compiled
+        self.enclosing_locals = frozenset()
+        self.bound_names = bound_names
+
+    def block(self, stmts):
+        body = []
+        for stmt in stmts:
+            method = getattr(self, "compile_" + type(stmt).__name__, None)
+            if method is None:
+                raise CompileUnsupported(type(stmt).__name__)
+            for node in method(stmt):
+                for child in ast.walk(node):
+                    if 'lineno' in child._attributes and not hasattr(child, 'lineno'):
+                        child.lineno = child.end_lineno = stmt.line
+                        child.col_offset = child.end_col_offset = 0
+                body.append(node)
+        return body or [ast.Pass()]
+
+    def expr(self, expr, line):
+        return _expr_ast(expr, line, self.bound_names)
+
+    def compile_ErrorStmt(self, stmt):
+        return [ast.Expr(_raise_call(stmt.message, stmt.line))]
+
+    def compile_FunctionDefStmt(self, stmt):
+        params = stmt.params
+        defaults = [self.expr(stmt.default_exprs[p], stmt.line) for p in params if p in stmt.default_exprs]
+        # Python only allows defaults on trailing parameters
+        if any(p in stmt.default_exprs for p in params[:len(params) - len(defaults)]):
+            raise CompileUnsupported("default before required parameter")
+        # The interpreter reads a global of the same name until the function
+        # sets its own variable; a Python local would be unbound instead
+        early = _read_before_set(stmt.body, set(params), set(stmt.slot_index) - set(params))
+        if early:
+            raise CompileUnsupported(f"'{min(early)}' is read before the function sets it")
+        # A nested function reads its enclosing function's variable, but
+        # updates the global; a global declaration would read the global too
+        declared = sorted(_global_names(stmt.body) - set(stmt.slot_index))
+        shadowed = self.enclosing_locals.intersection(declared)
+        if shadowed:
+            raise CompileUnsupported(f"'{min(shadowed)}' is updated as a global but read from the enclosing function")
+
+        was_in_function, self.in_function = self.in_function, True
+        enclosing_locals = self.enclosing_locals
+        self.enclosing_locals = enclosing_locals | set(stmt.slot_index)
+        try:
+            body = self.block(stmt.body)
+        finally:
+            self.in_function = was_in_function
+            self.enclosing_locals = enclosing_locals
+        if declared:
+            body.insert(0, ast.Global(names=declared))
+
+        args = ast.arguments(
+            posonlyargs=[], args=[ast.arg(arg=p) for p in params],
+            # Extra positional arguments are ignored, as in the interpreter
+            vararg=ast.arg(arg='_ez_args'),
+            kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=defaults)
+        decorators = [_name('_ez_memo')] if stmt.memo else []
+        return [ast.FunctionDef(name=stmt.name, args=args, body=body, decorator_list=decorators, returns=None)]
+
+    def compile_ReturnStmt(self, stmt):
+        if stmt.exprs is None:
+            value = ast.Constant(None)
+        elif len(stmt.exprs) == 1:
+            value = self.expr(stmt.exprs[0], stmt.line)
+        else:
+            value = ast.Tuple(elts=[self.expr(e, stmt.line) for e in stmt.exprs], ctx=ast.Load())
+        if self.in_function:
+            return [ast.Return(value=value)]
+        # A top-level return ends the script
+        return [ast.Raise(exc=_call('_ez_Return', value), cause=None)]
+
+    def compile_BreakStmt(self, stmt):
+        return [ast.Break()]
+
+    def compile_ContinueStmt(self, stmt):
+        return [ast.Continue()]
+
+    def compile_ThrowStmt(self, stmt):
+        message = _call('str', self.expr(stmt.expr, stmt.line))
+        return [ast.Expr(_call('_ez_raise', message, ast.Constant(stmt.line)))]
+
+    def compile_ReadFileStmt(self, stmt):
+        value = _call('_ez_read_file', self.expr(stmt.file_expr, stmt.line), ast.Constant(stmt.line),
+                      ast.Constant(stmt.format))
+        return [ast.Assign(targets=[_name(stmt.var_name, ast.Store())], value=value)]
+
+    def compile_LetStmt(self, stmt):
+        return [ast.Assign(targets=[_name(stmt.var_name, ast.Store())], value=self.expr(stmt.expr, stmt.line))]
+
+    def compile_MultiLetStmt(self, stmt):
+        target = ast.Tuple(elts=[_name(v, ast.Store()) for v in stmt.var_names], ctx=ast.Store())
+        value = _call('_ez_unpack', self.expr(stmt.expr, stmt.line), ast.Constant(len(stmt.var_names)))
+        return [ast.Assign(targets=[target], value=value)]
+
+    _AUG_AST_OPS = {
+        "+=": "Add", "-=": "Sub", "*=": "Mult", "/=": "Div",
+        "//=": "FloorDiv", "%=": "Mod", "**=": "Pow",
+    }
+
+    def compile_AugAssignStmt(self, stmt):
+        op = getattr(ast, self._AUG_AST_OPS[stmt.op])()
+        return [ast.AugAssign(target=_name(stmt.var_name, ast.Store()), op=op,
+                              value=self.expr(stmt.expr, stmt.line))]
+
+    def compile_PrintStmt(self, stmt):
+        return [ast.Expr(_call('_ez_print', *[self.expr(p, stmt.line) for p in stmt.parts]))]
+
+    def compile_WaitStmt(self, stmt):
+        return [ast.Expr(_call('_ez_sleep', self.expr(stmt.expr, stmt.line), ast.Constant(stmt.line)))]
+
+    def compile_AwaitStmt(self, stmt):
+        value = _call('_ez_await', self.expr(stmt.expr, stmt.line), ast.Constant(stmt.line))
+        if stmt.var_name is None:
+            return [ast.Expr(value)]
+        return [ast.Assign(targets=[_name(stmt.var_name, ast.Store())], value=value)]
+
+    def compile_WriteFileStmt(self, stmt):
+        return [ast.Expr(_call('_ez_write_file', self.expr(stmt.content_expr, stmt.line),
+                               self.expr(stmt.file_expr, stmt.line),
+                               ast.Constant(stmt.mode), ast.Constant(stmt.line),
+                               ast.Constant(stmt.format)))]
+
+    def compile_IfStmt(self, stmt):
+        orelse = self.block(stmt.else_body) if stmt.else_body is not None else []
+        node = None
+        for condition, line, body in reversed(stmt.branches):
+            node = ast.If(test=self.expr(condition, line), body=self.block(body), orelse=orelse,
+                          lineno=line, end_lineno=line, col_offset=0, end_col_offset=0)
+            orelse = [node]
+        return [node]
+
+    def compile_LoopStmt(self, stmt):
+        count = _call('range', _call('_ez_loop_count', self.expr(stmt.count_expr, stmt.line),
+                                     ast.Constant(stmt.line)))
+        return [ast.For(target=_name('loop_index', ast.Store()), iter=count,
+                        body=self.block(stmt.body), orelse=[])]
+
+    def compile_WhileStmt(self, stmt):
+        return [ast.While(test=self.expr(stmt.condition, stmt.line), body=self.block(stmt.body), orelse=[])]
+
+    def compile_ForEachStmt(self, stmt):
+        iterable = self.expr(stmt.iterable_expr, stmt.line)
+        if stmt.source is None:
+            return [ast.For(target=_name(stmt.var_name, ast.Store()), iter=iterable,
+                            body=self.block(stmt.body), orelse=[])]
+        # with <reader> as _ez_reader_<line>: for x in _ez_reader_<line>: ...
+        reader = f"_ez_reader_{stmt.line}"
+        args = [iterable, ast.Constant(stmt.line)]
+        if stmt.columns_expr is not None:
+            args.append(self.expr(stmt.columns_expr, stmt.line))
+        opened = ast.Call(func=ast.Subscript(value=_name('_ez_file_sources'),
+                                             slice=ast.Constant(stmt.source), ctx=ast.Load()),
+                          args=args, keywords=[])
+        loop = ast.For(target=_name(stmt.var_name, ast.Store()), iter=_name(reader),
+                       body=self.block(stmt.body), orelse=[])
+        return [ast.With(items=[ast.withitem(context_expr=opened,
+                                             optional_vars=_name(reader, ast.Store()))],
+                         body=[loop])]
+
+    def compile_TryStmt(self, stmt):
+        handler = self.block(stmt.handler)
+        if stmt.error_var:
+            message = _call('_ez_catch_message', _name('_ez_exc'))
+            handler.insert(0, ast.Assign(targets=[_name(stmt.error_var, ast.Store())], value=message))
+        return [ast.Try(
+            body=self.block(stmt.body),
+            handlers=[
+                # Control flow signals pass through a catch
+                ast.ExceptHandler(type=_name('_ez_signals'), name=None, body=[ast.Raise(exc=None, cause=None)]),
+                ast.ExceptHandler(type=_name('_ez_Exception'), name='_ez_exc', body=handler),
+            ],
+            orelse=[], finalbody=[])]
+
+    def compile_FlushFileStmt(self, stmt):
+        return [ast.Expr(_call('_ez_flush_file', self.expr(stmt.file_expr, stmt.line), ast.Constant(stmt.line)))]
+
+    def compile_OpenFileStmt(self, stmt):
+        value = _call('_ez_open_file', self.expr(stmt.file_expr, stmt.line), ast.Constant(stmt.line))
+        return [ast.Assign(targets=[_name(stmt.var_name, ast.Store())], value=value)]
+
+    def compile_CloseFileStmt(self, stmt):
+        return [ast.Expr(_call('_ez_close_file', self.expr(stmt.var_name, stmt.line), ast.Constant(stmt.line)))]
+
+    def compile_ExprStmt(self, stmt):
+        return [ast.Expr(self.expr(stmt.expr, stmt.line))]
+
+def compile_program(stmts, filename="<ezscript>"):
+    """Compile parsed statements to a Python code object.
+
+    Raises CompileUnsupported if the program uses a statement the compiler
+    cannot translate. Line numbers in the code object are EzScript lines.
+    """
+    _import_ast()
+    body = _Compiler(_bound_names(stmts)).block(stmts)
+    module = ast.Module(body=body, type_ignores=[])
+    return compile(module, filename, "exec", dont_inherit=True)
+
+def _ezcache_path(path):
+    path = Path(path)
+    return path.parent / EZCACHE_DIR / f"{path.stem}.{sys.implementation.cache_tag}.ezc"
+
+def _ezcache_header(source):
+    """Magic plus a hash of the interpreter version and the source text."""
+    import hashlib
+    digest = hashlib.sha256(f"{__version__}/{_COMPILER_VERSION}/".encode())
+    digest.update(source.encode())
+    return b"EZC1" + digest.digest()
+
+def load_compiled(path, source):
+    """Return the compiled code for a script, using __ezcache__ when fresh.
+
+    Raises CompileUnsupported if the script cannot be compiled.
+    """
+    import marshal
+    cache_file = _ezcache_path(path)
+    header = _ezcache_header(source)
+    try:
+        data = cache_file.read_bytes()
+        if data.startswith(header):
+            return marshal.loads(data[len(header):])
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+
+    code = compile_program(parse_program(source.split("\n")), str(path))
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_bytes(header + marshal.dumps(code))
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        # A read-only source directory just means no cache
+        pass
+    return code
+
+def _compiled_line(tb, filename):
+    """The EzScript line of the innermost compiled frame in a traceback."""
+    line = None
+    while tb is not None:
+        if tb.tb_frame.f_code.co_filename == filename:
+            line = tb.tb_lineno
+        tb = tb.tb_next
+    return line
+
+def _compiled_error(e, filename):
+    """The EzScriptError for an exception raised inside compiled code."""
+    if isinstance(e, EzScriptError):
+        if e.line_number is None:
+            e.line_number = _compiled_line(e.__traceback__, filename)
+        return e
+    return _translate_error(e, _compiled_line(e.__traceback__, filename))
+
+def run_compiled(code, namespace=None):
+    """Execute compiled script code, reporting errors like the interpreter."""
+    if namespace is None:
+        namespace = {"__builtins__": _COMPILED_BUILTINS}
+    try:
+        exec(code, namespace)
+    except Return:
+        pass
+    except Exception as e:
+        raise _compiled_error(e, code.co_filename)
+
+# ==========================
+# Interpreter instances
+# ==========================
+
+class EzInterpreter:
+    """Runs EzScript programs, keeping all of a program's state.
+
+    Variables, functions, key states, the window and its objects, timers,
+    the loadImage cache and the files write/append keep open belong to the
+    instance, so independent instances can run scripts in separate threads
+    of one process. One instance runs one script at a time.
+
+    Errors are raised as EzScriptError with the line number set; `lines`
+    holds the source of the last script for reporting them. Tk windows
+    belong to the thread that creates them, so scripts that draw from
+    worker threads should use the pil backend.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.functions = {}
+        self.key_states = {}
+        self.builtins = {**BUILTINS, 'keyStates': self.key_states}
+        self.compiled_builtins = {**_COMPILED_BUILTINS, 'keyStates': self.key_states}
+        self.scope = Scope(self.variables, self.functions, builtins=self.builtins)
+        # Globals of the last compiled program, where its functions live
+        self.namespace = None
+        self.code = None
+        self.lines = []
+        self.files = FilePool(FILE_POOL_SIZE)
+        self.image_cache = LRUCache(1024, IMAGE_CACHE_BYTES)
+        self.window = None
+        self.canvas = None
+        # Canvas item id -> kind ("circle", "rectangle", "line", "text", "image")
+        # for every object the script can still move, recolor or delete
+        self.window_objects = {}
+        # PhotoImages shown on the canvas by item id; Tk blanks an image once
+        # Python drops its last reference
+        self.canvas_images = {}
+        self.timers = {}
+        self.next_timer_id = 1
+        self.frame_timer = None
+        self.timer_error = None
+        # Worker processes for parallel for each, started on first use
+        self.pool = None
+        self.pool_size = 0
+        # Event loop for spawned tasks, started by the first spawn, and the
+        # baton a task holds while it runs EzScript
+        self.task_loop = None
+        self.task_loop_thread = None
+        self.tasks = []
+        self.tasks_cancelled = None
+        self.baton = threading.Lock()
+        # Profiler timing this interpreter's run, see start_profiling()
+        self.profiler = None
+
+    @contextmanager
+    def _activated(self):
+        previous = getattr(_active, "interpreter", None)
+        _active.interpreter = self
+        try:
+            yield
+        finally:
+            _active.interpreter = previous
+
+    def run_file(self, file, compiled=False, profile=None):
+        """Run an EzScript file.
+
+        With compiled=True the script is translated to Python bytecode (cached
+        in __ezcache__) when every statement it uses can be compiled.
+        With profile set to a path prefix, the script is interpreted with the
+        profiler on and <prefix>.profile.txt/.json are written when it ends.
+        Only this interpreter is timed, not others running at the same time.
+        """
+        file = os.fspath(file)
+        if not file.endswith(".ez"):
+            raise ValueError("EzScript files must end with .ez")
+        with open(file) as f:
+            source = f.read()
+        self.lines = source.split("\n")
+        code = None
+        if compiled and not profile:
+            try:
+                code = load_compiled(file, source)
+            except CompileUnsupported:
+                pass
+        self._run(code, profile, file)
+
+    def run_string(self, source, compiled=False, filename="<string>"):
+        """Run EzScript source text; compiled code is not cached on disk."""
+        self.lines = source.split("\n")
+        code = None
+        if compiled:
+            try:
+                code = compile_program(parse_program(self.lines), filename)
+            except CompileUnsupported:
+                pass
+        self._run(code)
+
+    def _run(self, code, profile=None, file=None):
+        self.variables.clear()
+        self.functions.clear()
+        self.namespace = None
+        self.code = code
+        # Each EzScript call nests several Python frames
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), RECURSION_LIMIT))
+
+        profiler = None
+        if profile:
+            profiler = Profiler()
+            start_profiling(self, profiler)
+            started = time.perf_counter()
+        try:
+            with self._activated():
+                try:
+                    try:
+                        if code is not None:
+                            self.namespace = {"__builtins__": self.compiled_builtins}
+                            run_compiled(code, self.namespace)
+                        else:
+                            exec_block(parse_program(self.lines), self.scope)
+                    except Return:
+                        pass
+                    except BaseException:
+                        self._finish_tasks(cancel=True)
+                        raise
+                    task_error = self._finish_tasks()
+                    if task_error is not None:
+                        raise task_error
+                finally:
+                    self.close_pool()
+                    self._close_files()
+        finally:
+            if profiler:
+                stop_profiling(self)
+                profiler.total = time.perf_counter() - started
+                profiler.write_reports(profile, self.lines, file)
+
+    def call_function(self, name, *args, **kwargs):
+        """Call a function the last script defined and return its result.
+
+        As at the end of a script, tasks the call spawned are awaited and
+        files it wrote are closed when it returns.
+        """
+        function = self.functions.get(name)
+        if function is None and self.namespace is not None:
+            function = self.namespace.get(name)
+        if not callable(function):
+            raise EzScriptError(f"Function '{name}' is not defined")
+        with self._activated():
+            try:
+                try:
+                    result = function(*args, **kwargs)
+                except Exception as e:
+                    self._finish_tasks(cancel=True)
+                    raise self._script_error(e)
+                except BaseException:
+                    self._finish_tasks(cancel=True)
+                    raise
+                task_error = self._finish_tasks()
+                if task_error is not None:
+                    raise task_error
+                return result
+            finally:
+                self.close_pool()
+                self._close_files()
+
+    def _script_error(self, e):
+        """`e` as an EzScriptError with the line of the script it came from."""
+        if self.code is None:
+            return _translate_error(e)
+        return _compiled_error(e, self.code.co_filename)
+
+    def _start_tasks(self):
+        """The event loop tasks are scheduled on, started on first use."""
+        if self.task_loop is None:
+            import asyncio
+            self.task_loop = asyncio.new_event_loop()
+            self.task_loop_thread = threading.Thread(
+                target=self.task_loop.run_forever, name="ezscript tasks", daemon=True)
+            self.task_loop_thread.start()
+            # Set when the script fails, so its tasks stop instead of running on
+            self.tasks_cancelled = threading.Event()
+            # From now on the thread running the script holds the baton
+            self.baton.acquire()
+        return self.task_loop
+
+    def spawn(self, function, args):
+        """Start function(*args) as a task and return its EzTask."""
+        import asyncio
+        loop = self._start_tasks()
+        cancelled = self.tasks_cancelled
+
+        async def run():
+            done = loop.create_future()
+
+            def body():
+                _active.tasks_cancelled = cancelled
+                with self.baton, self._activated():
+                    if cancelled.is_set():
+                        return
+                    try:
+                        result = function(*args)
+                    except _TaskCancelled:
+                        return
+                    except Exception as e:
+                        loop.call_soon_threadsafe(done.set_exception, self._script_error(e))
+                    else:
+                        loop.call_soon_threadsafe(done.set_result, result)
+
+            threading.Thread(target=body, name=f"ezscript task {name}", daemon=True).start()
+            return await done
+
+        name = getattr(function, "name", None) or getattr(function, "__name__", "task")
+        task = EzTask(name, asyncio.run_coroutine_threadsafe(run(), loop))
+        self.tasks.append(task)
+        return task
+
+    def blocking(self, function, *args):
+        """Call function(*args), letting other tasks run until it returns.
+
+        In a task of a script that has failed meanwhile, raises
+        _TaskCancelled instead of returning.
+        """
+        if self.task_loop is None:
+            return function(*args)
+        self.baton.release()
+        try:
+            return function(*args)
+        finally:
+            self.baton.acquire()
+            cancelled = getattr(_active, "tasks_cancelled", None)
+            if cancelled is not None and cancelled.is_set():
+                raise _TaskCancelled()
+
+    def wait(self, seconds):
+        """Sleep; while tasks exist, on the event loop so they can run."""
+        if self.task_loop is None:
+            time.sleep(seconds)
+            return
+        import asyncio
+        self.blocking(asyncio.run_coroutine_threadsafe(asyncio.sleep(seconds), self.task_loop).result)
+
+    def await_tasks(self, tasks):
+        """The results of `tasks`, waiting for them to finish.
+
+        The first task that failed raises its error here.
+        """
+        if not tasks:
+            return []
+        import asyncio
+        for task in tasks:
+            task.retrieved = True
+
+        async def gather():
+            return await asyncio.gather(*(asyncio.wrap_future(task.future) for task in tasks))
+
+        return self.blocking(asyncio.run_coroutine_threadsafe(gather(), self.task_loop).result)
+
+    def _finish_tasks(self, cancel=False):
+        """Wait for every task, then stop the event loop.
+
+        Returns the error of the first failed task nothing awaited, so it is
+        not lost, or None. With cancel set, as when the script failed, the
+        tasks are not waited for: tasks that have not started never run,
+        and the others stop the next time they wait.
+        """
+        if self.task_loop is None:
+            return None
+        try:
+            # Tasks may spawn more tasks while this waits
+            i = 0
+            while not cancel and i < len(self.tasks):
+                self.blocking(self.tasks[i].future.exception)
+                i += 1
+        except BaseException:
+            cancel = True
+            raise
+        finally:
+            if cancel:
+                self.tasks_cancelled.set()
+            self.baton.release()
+            if cancel:
+                import asyncio
+                asyncio.run_coroutine_threadsafe(_cancel_pending(), self.task_loop).result()
+            self.task_loop.call_soon_threadsafe(self.task_loop.stop)
+            self.task_loop_thread.join()
+            self.task_loop.close()
+            tasks, self.tasks = self.tasks, []
+            self.task_loop = self.task_loop_thread = None
+        if cancel:
+            return None
+        for task in tasks:
+            if not task.retrieved and task.future.exception() is not None:
+                return task.future.exception()
+        return None
+
+    def process_pool(self, workers):
+        """The pool parallel loops run on, restarted if `workers` changed."""
+        if self.pool is not None and self.pool_size != workers:
+            self.close_pool()
+        if self.pool is None:
+            import multiprocessing
+            self.pool = multiprocessing.get_context().Pool(workers, initializer=_parallel_worker_init)
+            self.pool_size = workers
+        return self.pool
+
+    def close_pool(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def _close_files(self):
+        try:
+            self.files.close_all()
+        except OSError as e:
+            raise EzScriptError(f"Cannot write file: {e}")
+
+# The interpreter behind run_file(), and the one builtins use on threads
+# that are not running an EzInterpreter
+default_interpreter = EzInterpreter()
+variables = default_interpreter.variables
+functions = default_interpreter.functions
+key_states = default_interpreter.key_states
+global_scope = default_interpreter.scope
+
+def _report_error(e, lines):
+    print(f"\n{'='*60}", file=sys.stderr)
+    print(f"EzScript Error on line {e.line_number}:", file=sys.stderr)
+    print(f"{'='*60}", file=sys.stderr)
+    if e.line_number and 0 < e.line_number <= len(lines):
+        print(f"  {lines[e.line_number-1].strip()}", file=sys.stderr)
+        print(f"  {'~' * len(lines[e.line_number-1].strip())}", file=sys.stderr)
+    print(f"\n{e.message}", file=sys.stderr)
+    print(f"{'='*60}\n", file=sys.stderr)
+
+def _run_reporting_errors(interpreter, file, compiled=False, profile=None):
+    """Run a file, printing any error to stderr; return the exit status."""
+    try:
+        interpreter.run_file(file, compiled=compiled, profile=profile)
+    except FileNotFoundError:
+        print(f"Error: File '{file}' not found", file=sys.stderr)
+        return 1
+    except EzScriptError as e:
+        _report_error(e, interpreter.lines)
+        return 1
+    except Exception as e:
+        print(f"\nUnexpected Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def run_file(file, compiled=False, profile=None):
+    """Run an EzScript file in the default interpreter, printing any error
+    and exiting with status 1. See EzInterpreter.run_file."""
+    if _run_reporting_errors(default_interpreter, file, compiled, profile):
+        sys.exit(1)
+
+# ==========================
+# Batch runner (--batch)
+# ==========================
+# Scripts run on a pool of worker processes that stay up between scripts,
+# so only the first script in each worker pays for starting Python and
+# importing the interpreter. Each script gets a fresh EzInterpreter.
+
+# Default --timeout: seconds a batch script may run before its worker is
+# killed and replaced
+BATCH_TIMEOUT = 60
+
+def _run_captured(file, compiled):
+    """Run one script, returning its exit status, output and run time."""
+    out, err = io.StringIO(), io.StringIO()
+    started = time.perf_counter()
+    with redirect_stdout(out), redirect_stderr(err):
+        status = _run_reporting_errors(EzInterpreter(), file, compiled)
+    return {
+        "exit_code": status,
+        "seconds": round(time.perf_counter() - started, 6),
+        "stdout": out.getvalue(),
+        "stderr": err.getvalue(),
+    }
+
+def _batch_worker(conn, headless, backend):
+    """Worker process loop: run each (file, compiled) job it is sent."""
+    global HEADLESS, BACKEND
+    HEADLESS, BACKEND = headless, backend
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        conn.send(_run_captured(*job))
+
+class _BatchWorker:
+    """A worker process and the script it is running, if any."""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_batch_worker, args=(child, HEADLESS, BACKEND),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+        self.file = None
+        self.started = None
+
+    def submit(self, file, compiled):
+        self.file = file
+        self.started = time.perf_counter()
+        self.conn.send((file, compiled))
+
+    def finish(self):
+        file, self.file = self.file, None
+        return file, time.perf_counter() - self.started
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+def run_batch(directory, jobs=None, timeout=BATCH_TIMEOUT, compiled=False):
+    """Run every .ez file under `directory` and return a summary dict.
+
+    Up to `jobs` scripts run at once, each in a reused worker process. A
+    script still running after `timeout` seconds has its worker killed and
+    replaced. Each result has the script's exit code ("timeout" or "crashed"
+    instead when it did not finish), run time, stdout and stderr.
+    """
+    import multiprocessing
+    from multiprocessing.connection import wait
+
+    files = sorted(str(p) for p in Path(directory).rglob("*.ez") if p.is_file())
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(files) or 1))
+    context = multiprocessing.get_context()
+    pending = deque(files)
+    results = {}
+    started = time.perf_counter()
+    workers = [_BatchWorker(context) for _ in range(min(jobs, len(files)))]
+    try:
+        while True:
+            for worker in workers:
+                if worker.file is None and pending:
+                    worker.submit(pending.popleft(), compiled)
+            busy = [w for w in workers if w.file is not None]
+            if not busy:
+                break
+            wait_for = None
+            if timeout:
+                first_deadline = min(w.started for w in busy) + timeout
+                wait_for = max(0, first_deadline - time.perf_counter())
+            ready = wait([w.conn for w in busy], wait_for)
+            for i, worker in enumerate(workers):
+                if worker.file is None:
+                    continue
+                if worker.conn in ready:
+                    try:
+                        result = worker.conn.recv()
+                    except (EOFError, OSError):
+                        file, elapsed = worker.finish()
+                        results[file] = {"exit_code": "crashed", "seconds": round(elapsed, 6),
+                                         "stdout": "", "stderr": ""}
+                        worker.kill()
+                        workers[i] = _BatchWorker(context)
+                        continue
+                    file, _ = worker.finish()
+                    results[file] = result
+                elif timeout and time.perf_counter() - worker.started >= timeout:
+                    file, elapsed = worker.finish()
+                    results[file] = {"exit_code": "timeout", "seconds": round(elapsed, 6),
+                                     "stdout": "", "stderr": f"Timed out after {timeout} seconds\n"}
+                    worker.kill()
+                    workers[i] = _BatchWorker(context)
+    finally:
+        for worker in workers:
+            worker.stop()
+
+    scripts = [{"file": file, **results[file]} for file in files]
+    return {
+        "jobs": jobs,
+        "timeout": timeout,
+        "compiled": compiled,
+        "total_seconds": round(time.perf_counter() - started, 6),
+        "passed": sum(1 for r in scripts if r["exit_code"] == 0),
+        "failed": sum(1 for r in scripts if r["exit_code"] != 0),
+        "scripts": scripts,
+    }
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="ezscript", description="Run an EzScript (.ez) file.")
+    parser.add_argument("file", nargs="?", help="the .ez script to run")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="run every .ez file under DIR and print a JSON summary")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="--batch: number of worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=BATCH_TIMEOUT,
+                        help=f"--batch: seconds each script may run (default: {BATCH_TIMEOUT}; 0 for no limit)")
+    parser.add_argument("--summary", metavar="FILE",
+                        help="--batch: write the JSON summary to FILE instead of stdout")
+    parser.add_argument("--compile", action="store_true",
+                        help=f"translate the script to Python bytecode, cached in {EZCACHE_DIR}/")
+    parser.add_argument("--headless", action="store_true",
+                        help="never import tkinter or Pillow; createWindow does nothing")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="draw in a Tk window (tk) or into an off-screen image for "
+                             "saveFrame (pil); default: $EZSCRIPT_BACKEND or tk")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each line and function; writes <script>.profile.txt and .profile.json")
+    parser.add_argument("--profile-output", metavar="PREFIX",
+                        help="path prefix for the --profile reports instead of the script path")
+    args = parser.parse_args(argv)
+    if (args.file is None) == (args.batch is None):
+        parser.error("give either a script or --batch DIR")
+    if args.batch and args.profile:
+        parser.error("--profile cannot be used with --batch")
+    profile = None
+    if args.profile:
+        profile = args.profile_output or str(Path(args.file).with_suffix(""))
+    global HEADLESS, BACKEND
+    if args.headless:
+        HEADLESS = True
+    if args.backend:
+        BACKEND = args.backend
+    elif BACKEND not in BACKENDS:
+        parser.error(f"EZSCRIPT_BACKEND must be one of: {', '.join(BACKENDS)}")
+    if args.batch:
+        if not os.path.isdir(args.batch):
+            parser.error(f"--batch: '{args.batch}' is not a directory")
+        summary = run_batch(args.batch, args.jobs, args.timeout, args.compile)
+        text = json.dumps(summary, indent=2)
+        if args.summary:
+            Path(args.summary).write_text(text + "\n", encoding="utf-8")
+        else:
+            print(text)
+        sys.exit(1 if summary["failed"] else 0)
+    run_file(args.file, compiled=args.compile, profile=profile)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
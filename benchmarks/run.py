@@ -0,0 +1,248 @@
+"""Run the EzScript benchmark programs and report timings as JSON.
+
+Each ``*.ez`` file in this folder is run several times in a fresh interpreter
+process. The report has the median wall time, operations per second (from the
+``# ops: N`` header of the script) and peak memory of each benchmark, and the
+startup time: how long the interpreter takes to run an empty script.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --compare HEAD~3
+    python benchmarks/run.py --compare old/ezscript.py --max-slowdown 1.10
+
+``--compare`` takes either a path to another ``ezscript.py`` or a git revision
+of this repository. With ``--max-slowdown`` the runner exits with status 1 if
+any benchmark, or startup, got slower than that ratio, so it can guard an
+upgrade. ``--max-startup MS`` fails the run when startup alone takes longer.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+INTERPRETER = REPO_ROOT / "Interpreter" / "ezscript.py"
+CORE_MODULE = "ezscript_core.py"
+# Measure the interpreter as a default Python install runs it: with cached
+# bytecode for the modules it imports
+BENCH_ENV = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+OPS_RE = re.compile(r"^#\s*ops:\s*(\d+)", re.MULTILINE)
+
+
+def find_benchmarks(names=None):
+    scripts = sorted(BENCH_DIR.glob("*.ez"))
+    if names:
+        scripts = [p for p in scripts if p.stem in names]
+        missing = set(names) - {p.stem for p in scripts}
+        if missing:
+            sys.exit(f"unknown benchmark(s): {', '.join(sorted(missing))}")
+    return scripts
+
+
+def read_ops(script):
+    match = OPS_RE.search(script.read_text(encoding="utf-8"))
+    return int(match.group(1)) if match else None
+
+
+def interpreter_flags(interpreter, compiled=False):
+    """Pick the options an interpreter revision understands.
+
+    Older revisions take only the script path, so flags are passed only when
+    the interpreter source mentions them. Newer ones keep it in
+    ``ezscript_core.py`` next to the ``ezscript.py`` launcher.
+    """
+    source = Path(interpreter).read_text(encoding="utf-8")
+    core = Path(interpreter).with_name(CORE_MODULE)
+    if core.is_file():
+        source += core.read_text(encoding="utf-8")
+    flags = []
+    if "--headless" in source:
+        flags.append("--headless")
+    if compiled and "--compile" in source:
+        flags.append("--compile")
+    return flags
+
+
+def run_once(interpreter, flags, script, workdir):
+    """Run ``script`` once; return (seconds, peak_rss_kb, returncode)."""
+    cmd = [sys.executable, str(interpreter), *flags, str(script)]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=workdir, env=BENCH_ENV, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+    if hasattr(os, "wait4"):
+        # wait4 gives the resource usage of this child alone.
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        rss = usage.ru_maxrss
+        if sys.platform == "darwin":
+            rss //= 1024  # bytes on macOS, kilobytes on Linux
+    else:
+        proc.wait()
+        elapsed = time.perf_counter() - start
+        rss = None
+    return elapsed, rss, proc.returncode
+
+
+def run_suite(interpreter, scripts, repeat, compiled=False):
+    flags = interpreter_flags(interpreter, compiled)
+    results = {}
+    for script in scripts:
+        ops = read_ops(script)
+        times, peak, error = [], None, None
+        with tempfile.TemporaryDirectory(prefix="ezbench-") as workdir:
+            if compiled:
+                # Warm the bytecode cache so the runs measure execution.
+                run_once(interpreter, flags, script, workdir)
+            for _ in range(repeat):
+                elapsed, rss, code = run_once(interpreter, flags, script, workdir)
+                if code != 0:
+                    error = f"exit status {code}"
+                    break
+                times.append(elapsed)
+                if rss is not None:
+                    peak = max(peak or 0, rss)
+        if error:
+            results[script.stem] = {"error": error}
+            print(f"  {script.stem:<16} failed ({error})", file=sys.stderr)
+            continue
+        median = statistics.median(times)
+        results[script.stem] = {
+            "median_seconds": round(median, 6),
+            "min_seconds": round(min(times), 6),
+            "ops": ops,
+            "ops_per_second": round(ops / median, 1) if ops else None,
+            "peak_rss_kb": peak,
+            "runs": [round(t, 6) for t in times],
+        }
+        print(f"  {script.stem:<16} {median * 1000:9.1f} ms", file=sys.stderr)
+    return results
+
+
+def measure_startup(interpreter, repeat):
+    """Median time to start the interpreter and run an empty script."""
+    flags = interpreter_flags(interpreter)
+    times = []
+    with tempfile.TemporaryDirectory(prefix="ezbench-") as workdir:
+        script = Path(workdir) / "empty.ez"
+        script.write_text("# startup\n", encoding="utf-8")
+        for _ in range(repeat):
+            elapsed, _, code = run_once(interpreter, flags, script, workdir)
+            if code != 0:
+                print(f"  {'(startup)':<16} failed (exit status {code})", file=sys.stderr)
+                return {"error": f"exit status {code}"}
+            times.append(elapsed)
+    median = statistics.median(times)
+    print(f"  {'(startup)':<16} {median * 1000:9.1f} ms", file=sys.stderr)
+    return {
+        "median_seconds": round(median, 6),
+        "min_seconds": round(min(times), 6),
+        "runs": [round(t, 6) for t in times],
+    }
+
+
+def resolve_interpreter(spec, tmpdir):
+    """Return a path to ``ezscript.py`` for a file path or a git revision."""
+    path = Path(spec)
+    if path.is_file():
+        return path.resolve()
+    files = {}
+    for name in ("ezscript.py", CORE_MODULE):
+        try:
+            files[name] = subprocess.run(
+                ["git", "show", f"{spec}:Interpreter/{name}"],
+                cwd=REPO_ROOT, capture_output=True, check=True,
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            # Older revisions have no separate core module
+            pass
+    if "ezscript.py" not in files:
+        sys.exit(f"--compare: {spec!r} is neither a file nor a git revision")
+    for name, source in files.items():
+        (Path(tmpdir) / name).write_bytes(source)
+    return Path(tmpdir) / "ezscript.py"
+
+
+def compare(current, baseline):
+    """Time ratio current / baseline per benchmark (> 1 means slower)."""
+    ratios = {}
+    for name, result in current.items():
+        base = baseline.get(name, {})
+        if "median_seconds" in result and "median_seconds" in base:
+            ratios[name] = round(result["median_seconds"] / base["median_seconds"], 3)
+    return ratios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the EzScript benchmarks.")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark (default: 5)")
+    parser.add_argument("--interpreter", default=str(INTERPRETER),
+                        help="ezscript.py to measure (default: the one in this checkout)")
+    parser.add_argument("--compare", metavar="REV_OR_PATH",
+                        help="also measure another ezscript.py or git revision")
+    parser.add_argument("--compile", action="store_true", help="run scripts with --compile")
+    parser.add_argument("--max-slowdown", type=float, metavar="RATIO",
+                        help="exit with status 1 if a benchmark is slower than RATIO x baseline")
+    parser.add_argument("--max-startup", type=float, metavar="MS",
+                        help="exit with status 1 if starting the interpreter takes longer than MS")
+    parser.add_argument("--output", "-o", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    scripts = find_benchmarks(args.names)
+    interpreter = Path(args.interpreter).resolve()
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "compiled": args.compile,
+        "interpreter": str(interpreter),
+    }
+    print(f"{interpreter}:", file=sys.stderr)
+    report["startup"] = measure_startup(interpreter, args.repeat)
+    report["results"] = run_suite(interpreter, scripts, args.repeat, args.compile)
+
+    if args.compare:
+        with tempfile.TemporaryDirectory(prefix="ezbench-rev-") as tmpdir:
+            baseline = resolve_interpreter(args.compare, tmpdir)
+            print(f"{args.compare}:", file=sys.stderr)
+            report["baseline"] = {
+                "interpreter": args.compare,
+                "startup": measure_startup(baseline, args.repeat),
+                "results": run_suite(baseline, scripts, args.repeat, args.compile),
+            }
+        report["ratios"] = compare(
+            {"startup": report["startup"], **report["results"]},
+            {"startup": report["baseline"]["startup"], **report["baseline"]["results"]})
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    status = 0
+    if args.max_slowdown and args.compare:
+        slower = {n: r for n, r in report["ratios"].items() if r > args.max_slowdown}
+        for name, ratio in slower.items():
+            print(f"regression: {name} is {ratio:.2f}x the baseline time", file=sys.stderr)
+        if slower:
+            status = 1
+    startup = report["startup"].get("median_seconds")
+    if args.max_startup and (startup is None or startup * 1000 > args.max_startup):
+        shown = "failed" if startup is None else f"takes {startup * 1000:.1f} ms"
+        print(f"regression: startup {shown}, limit {args.max_startup:g} ms", file=sys.stderr)
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
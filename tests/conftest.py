@@ -0,0 +1,37 @@
+"""Shared helpers for the EzScript interpreter tests.
+
+Scripts run through the command line, in a temporary folder, exactly as a
+user would run them. Tests of the Python API use the `ez` fixture instead.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+INTERPRETER = Path(__file__).resolve().parent.parent / "Interpreter" / "ezscript.py"
+
+
+@pytest.fixture
+def run_ez(tmp_path):
+    """Run EzScript source; return (exit status, stdout + stderr)."""
+
+    def run(source, *flags, headless=True, timeout=60):
+        script = tmp_path / "script.ez"
+        script.write_text(source, encoding="utf-8")
+        proc = subprocess.run(
+            [sys.executable, str(INTERPRETER), *(["--headless"] if headless else []), *flags, str(script)],
+            cwd=tmp_path, capture_output=True, text=True, timeout=timeout,
+        )
+        return proc.returncode, proc.stdout + proc.stderr
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def ez():
+    """The interpreter module, imported into the test process."""
+    sys.path.insert(0, str(INTERPRETER.parent))
+    import ezscript_core
+    return ezscript_core
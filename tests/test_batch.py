@@ -0,0 +1,64 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import INTERPRETER
+
+
+def make_scripts(folder):
+    (folder / "sub").mkdir()
+    (folder / "ok.ez").write_text('print("hello")\n')
+    (folder / "ask.ez").write_text('let name be input("name? ")\nprint(name)\n')
+    (folder / "slow.ez").write_text("while true:\n    let x be 1\n")
+    (folder / "sub" / "fail.ez").write_text("let x be 1\nprint(x / 0)\n")
+    (folder / "notes.txt").write_text("not a script\n")
+
+
+def test_batch_summary(tmp_path):
+    scripts = tmp_path / "scripts"
+    scripts.mkdir()
+    make_scripts(scripts)
+    summary_file = tmp_path / "summary.json"
+    proc = subprocess.run(
+        [sys.executable, str(INTERPRETER), "--headless", "--batch", str(scripts),
+         "--jobs", "2", "--timeout", "2", "--summary", str(summary_file)],
+        capture_output=True, text=True, timeout=60,
+    )
+    assert (proc.returncode, proc.stdout) == (1, "")
+    summary = json.loads(summary_file.read_text())
+    assert (summary["jobs"], summary["timeout"], summary["compiled"]) == (2, 2.0, False)
+    assert (summary["passed"], summary["failed"]) == (1, 3)
+    results = {os.path.relpath(r["file"], scripts): r for r in summary["scripts"]}
+    assert list(results) == ["ask.ez", "ok.ez", "slow.ez", os.path.join("sub", "fail.ez")]
+
+    ask, ok, slow, fail = results.values()
+    # Workers have no stdin, so input() fails instead of waiting
+    assert ask["exit_code"] == 1 and "EOF when reading a line" in ask["stderr"]
+    assert (ok["exit_code"], ok["stdout"], ok["stderr"]) == (0, "hello\n", "")
+    assert (slow["exit_code"], slow["stderr"]) == ("timeout", "Timed out after 2.0 seconds\n")
+    assert 2 <= slow["seconds"] < 10
+    assert fail["exit_code"] == 1
+    assert "EzScript Error on line 2" in fail["stderr"] and "Cannot divide by zero" in fail["stderr"]
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="needs forked workers")
+def test_batch_replaces_a_crashed_worker(ez, tmp_path, monkeypatch):
+    for name in ("a.ez", "crash.ez", "z.ez"):
+        (tmp_path / name).write_text('print("ran")\n')
+    run_captured = ez._run_captured
+
+    def crash_on_request(file, compiled):
+        if file.endswith("crash.ez"):
+            os._exit(3)
+        return run_captured(file, compiled)
+
+    monkeypatch.setattr(ez, "_run_captured", crash_on_request)
+    monkeypatch.setattr(ez, "HEADLESS", True)
+    summary = ez.run_batch(tmp_path, jobs=1, timeout=30)
+    codes = [(os.path.basename(r["file"]), r["exit_code"], r["stdout"]) for r in summary["scripts"]]
+    assert codes == [("a.ez", 0, "ran\n"), ("crash.ez", "crashed", ""), ("z.ez", 0, "ran\n")]
+    assert (summary["passed"], summary["failed"]) == (2, 1)
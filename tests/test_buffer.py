@@ -0,0 +1,63 @@
+import pytest
+
+
+@pytest.mark.parametrize("expr, message", [
+    ('buf["a"]', "Buffer index must be a whole number, not str"),
+    ("buf[1.5]", "Buffer index must be a whole number, not float"),
+    ("buf[True]", "Buffer index must be a whole number, not bool"),
+    ("readInt(buf, True, 1)", "readInt: offset and size must be whole numbers"),
+    ("readInt(buf, 0, True)", "readInt: offset and size must be whole numbers"),
+])
+def test_bad_buffer_arguments_are_script_errors(run_ez, tmp_path, expr, message):
+    (tmp_path / "data.bin").write_bytes(b"hello")
+    status, output = run_ez(f'let buf be map file "data.bin"\nprint({expr})\n')
+    assert status == 1
+    assert "EzScript Error on line 2" in output
+    assert message in output
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_mapped_file_reads(run_ez, tmp_path, flags):
+    (tmp_path / "data.bin").write_bytes(b"HDR\x01\x02\xff\xfeTAIL caf\xc3\xa9")
+    status, output = run_ez(
+        'let buf be map file "data.bin"\n'
+        "print(len(buf), buf[0], buf[-1])\n"
+        "print(readInt(buf, 3, 2), readInt(buf, 3, 2, \"big\"), readInt(buf, 5, 2, \"little\", true))\n"
+        'print(buf.find("TAIL"), buf.find("TAIL", 8), buf.find("HDR", 0, 2), "caf" in buf)\n'
+        "let tail be buf[7:]\n"
+        'print(len(tail), tail.find("caf"), tail.decode())\n'
+        "print(tail[0:4].decode(), readInt(tail, 0, 1))\n",
+        *flags,
+    )
+    assert status == 0, output
+    assert output.splitlines() == [
+        "17 72 169",
+        "513 258 -257",
+        "7 -1 -1 True",
+        "10 5 TAIL café",
+        "TAIL 84",
+    ]
+
+
+def test_slices_share_the_mapping(ez, tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"0123456789")
+    buf = ez._map_file(str(path))
+    part = buf[2:8][1:3]
+    assert part.data is buf.data
+    assert (part.start, part.stop, part.decode()) == (3, 5, "34")
+    assert part.find(b"4") == 1 and part.find(buf[4:5]) == 1
+    assert len(buf[8:2]) == 0
+    buf.data.close()
+
+
+def test_empty_file_and_out_of_range_reads(run_ez, tmp_path):
+    (tmp_path / "empty.bin").write_bytes(b"")
+    (tmp_path / "data.bin").write_bytes(b"abc")
+    status, output = run_ez('let e be map file "empty.bin"\nprint(len(e), e.find("x"))\n')
+    assert (status, output) == (0, "0 -1\n")
+    for expr, message in [("buf[3]", "Buffer index 3 out of range"),
+                          ("readInt(buf, 2, 2)", "readInt: 2 bytes at offset 2 are outside the 3-byte buffer"),
+                          ("buf[::2]", "Buffer slices cannot have a step")]:
+        status, output = run_ez(f'let buf be map file "data.bin"\nprint({expr})\n')
+        assert status == 1 and message in output
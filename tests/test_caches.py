@@ -0,0 +1,58 @@
+import pytest
+
+LOOP = (
+    "let total be 0\n"
+    "loop 100 times:\n"
+    "    total += loop_index\n"
+    'print("total {total}, doubled {total * 2}")\n'
+)
+
+
+@pytest.fixture
+def caches(ez):
+    ez.expr_cache_clear()
+    ez._template_cache.clear()
+    yield ez
+    ez.expr_cache_clear()
+
+
+def test_expr_cache_counts_hits_and_misses(caches):
+    assert caches.eval_expr("2 * 21") == 42
+    assert caches.eval_expr("2 * 21") == 42
+    assert tuple(caches.expr_cache_info()) == (1, 1, caches.EXPR_CACHE_SIZE, 1)
+    caches.expr_cache_clear()
+    assert tuple(caches.expr_cache_info()) == (0, 0, caches.EXPR_CACHE_SIZE, 0)
+
+
+def test_loop_compiles_each_expression_once(caches, capsys):
+    interpreter = caches.EzInterpreter()
+    interpreter.run_string(LOOP)
+    first = caches.expr_cache_info()
+    assert first.misses == first.currsize == 4
+    assert first.hits >= 99
+    interpreter.run_string(LOOP)
+    assert caches.expr_cache_info().misses == first.misses
+    assert capsys.readouterr().out == "total 4950, doubled 9900\n" * 2
+
+
+def test_template_is_parsed_once(caches, capsys):
+    caches.EzInterpreter().run_string(
+        "function greet(name):\n"
+        '    print("hi {name}!")\n'
+        'for each who in ["ann", "bo", "cy"]:\n'
+        "    greet(who)\n"
+    )
+    assert capsys.readouterr().out == "hi ann!\nhi bo!\nhi cy!\n"
+    assert caches._template_cache.info().misses == 1
+
+
+def test_cached_expressions_resolve_names_per_scope(run_ez):
+    status, output = run_ez(
+        "let x be 100\n"
+        "function twice(x):\n"
+        "    return x * 2\n"
+        "loop 3 times:\n"
+        '    print("{twice(loop_index)} {x * 2}")\n'
+        "print(twice(x))\n"
+    )
+    assert (status, output) == (0, "0 200\n2 200\n4 200\n200\n")
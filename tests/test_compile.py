@@ -0,0 +1,66 @@
+import pytest
+
+SCRIPTS = {
+    "global read before local let": (
+        "let counter be 10\n"
+        "function bump():\n"
+        "    let counter be counter + 1\n"
+        "    return counter\n"
+        "print(bump())\n"
+        "print(counter)\n"
+    ),
+    "local set before it is read": (
+        "let total be 100\n"
+        "function add(items):\n"
+        "    let total be 0\n"
+        "    for each x in items:\n"
+        "        total += x\n"
+        "    return total\n"
+        "print(add([1, 2, 3]))\n"
+        "print(total)\n"
+    ),
+    "recursion": (
+        "function fib(n):\n"
+        "    if n < 2:\n"
+        "        return n\n"
+        "    return fib(n - 1) + fib(n - 2)\n"
+        'print("fib {fib(15)}")\n'
+    ),
+    "nested function reads enclosing locals": (
+        "let v be 0\n"
+        "function outer(a):\n"
+        "    let v be 10\n"
+        "    function inner(b):\n"
+        "        return a + v + b\n"
+        "    let first be inner(5)\n"
+        "    let v be 20\n"
+        "    return [first, inner(5)]\n"
+        "print(outer(1))\n"
+        "print(inner(0))\n"
+        "print(v)\n"
+    ),
+    "nested function updates a shadowed global": (
+        "let total be 100\n"
+        "function outer():\n"
+        "    let total be 5\n"
+        "    function add(x):\n"
+        "        total += x\n"
+        "        return total\n"
+        "    return add(1)\n"
+        "print(outer())\n"
+        "print(total)\n"
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(SCRIPTS))
+def test_compiled_output_matches_interpreter(run_ez, name):
+    interpreted = run_ez(SCRIPTS[name])
+    compiled = run_ez(SCRIPTS[name], "--compile")
+    assert interpreted[0] == 0, interpreted[1]
+    assert compiled == interpreted
+
+
+def test_global_read_before_local_let(run_ez):
+    status, output = run_ez(SCRIPTS["global read before local let"], "--compile")
+    assert (status, output.split()) == (0, ["11", "10"])
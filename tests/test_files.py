@@ -0,0 +1,98 @@
+import pytest
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_for_each_line_in_file(run_ez, tmp_path, flags):
+    (tmp_path / "notes.txt").write_text("first\n\nthird\r\nlast", encoding="utf-8")
+    status, output = run_ez(
+        'for each line in file "notes.txt":\n'
+        '    print("[{line}]")\n'
+        'for each line in lines("notes.txt"):\n'
+        "    print(len(line))\n",
+        *flags,
+    )
+    assert (status, output) == (0, "[first]\n[]\n[third]\n[last]\n5\n0\n5\n4\n")
+
+
+def test_lines_reads_the_file_lazily(ez, tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_text("x" * 99 + "\n" + ("y" * 99 + "\n") * 20000, encoding="utf-8")
+    reader = ez._lines(str(path))
+    assert next(reader) == "x" * 99
+    assert reader.file.buffer.tell() < path.stat().st_size // 10
+    assert sum(1 for _ in reader) == 20000
+    assert reader.file.closed
+
+
+@pytest.mark.parametrize("body, fails", [("    break\n", False), ("    let x be 1 / 0\n", True)])
+def test_for_each_closes_the_file_when_it_stops_early(ez, tmp_path, monkeypatch, body, fails):
+    (tmp_path / "data.txt").write_text("a\nb\nc\n", encoding="utf-8")
+    readers = []
+
+    def recording_lines(file_path, line_num=None):
+        readers.append(ez._lines(file_path, line_num))
+        return readers[-1]
+
+    monkeypatch.setitem(ez._FILE_SOURCES, "file", recording_lines)
+    monkeypatch.chdir(tmp_path)
+    source = 'for each line in file "data.txt":\n' + body
+    if fails:
+        with pytest.raises(ez.EzScriptError):
+            ez.EzInterpreter().run_string(source)
+    else:
+        ez.EzInterpreter().run_string(source)
+    assert len(readers) == 1 and readers[0].file.closed
+
+
+def test_missing_file_is_a_script_error(run_ez):
+    status, output = run_ez('for each line in file "nope.txt":\n    print(line)\n')
+    assert status == 1
+    assert "File not found: 'nope.txt'" in output
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_pooled_writes_are_seen_by_reads_and_at_exit(run_ez, tmp_path, flags):
+    status, output = run_ez(
+        'write "one\\n" to file "a.txt"\n'
+        'append "two\\n" to file "a.txt"\n'
+        'let text be read file "a.txt"\n'
+        "print(text)\n"
+        'write "fresh\\n" to file "a.txt"\n'
+        'open file "log.txt" as log\n'
+        'append "x" to file "log.txt"\n'
+        'append "y" to file log\n'
+        "close log\n"
+        'append "z" to file "log.txt"\n',
+        *flags,
+    )
+    assert (status, output) == (0, "one\ntwo\n\n")
+    assert (tmp_path / "a.txt").read_text() == "fresh\n"
+    assert (tmp_path / "log.txt").read_text() == "xyz"
+
+
+def test_pool_flushes_and_evicts_least_recently_used(ez, tmp_path):
+    a, b, c, pinned = (str(tmp_path / name) for name in ("a.txt", "b.txt", "c.txt", "pinned.txt"))
+    pool = ez.FilePool(2)
+    pool.open(pinned)
+    pool.write(pinned, "kept", "a")
+    pool.write(a, "A", "w")
+    assert (tmp_path / "a.txt").read_text() == ""
+    pool.flush(a)
+    assert (tmp_path / "a.txt").read_text() == "A"
+    pool.write(b, "B", "a")
+    pool.write(c, "C", "a")
+    # a and b were evicted (and so closed and flushed); pinned stays open
+    assert (tmp_path / "b.txt").read_text() == "B"
+    assert (tmp_path / "pinned.txt").read_text() == ""
+    pool.flush_all()
+    assert (tmp_path / "pinned.txt").read_text() == "kept"
+    pool.write(c, "again", "w")
+    pool.close_all()
+    assert (tmp_path / "c.txt").read_text() == "again"
+    pool.close_all()
+
+
+def test_written_files_are_flushed_when_the_script_fails(run_ez, tmp_path):
+    status, _ = run_ez('append "saved" to file "out.txt"\nlet x be 1 / 0\n')
+    assert status == 1
+    assert (tmp_path / "out.txt").read_text() == "saved"
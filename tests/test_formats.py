@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_json_round_trip(run_ez, tmp_path, flags):
+    (tmp_path / "in.json").write_text('{"name": "Zoë", "scores": [3, 4.5], "ok": true, "none": null}',
+                                      encoding="utf-8")
+    status, output = run_ez(
+        'let data be read json file "in.json"\n'
+        'print(data["name"], sum(data["scores"]), data["ok"], data["none"])\n'
+        'data["scores"].append(10)\n'
+        'write json data to file "out.json"\n',
+        *flags,
+    )
+    assert (status, output) == (0, "Zoë 7.5 True None\n")
+    written = (tmp_path / "out.json").read_text(encoding="utf-8")
+    assert json.loads(written) == {"name": "Zoë", "scores": [3, 4.5, 10], "ok": True, "none": None}
+    assert "Zoë" in written and written.endswith("}\n")
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_ndjson_append_and_stream(run_ez, tmp_path, flags):
+    (tmp_path / "events.ndjson").write_text('{"n": 1}\n\n[2, "two"]\n', encoding="utf-8")
+    status, output = run_ez(
+        'append json {"n": 3, "tags": ["a"]} to file "events.ndjson"\n'
+        'for each record in ndjson file "events.ndjson":\n'
+        "    print(record)\n",
+        *flags,
+    )
+    assert (status, output) == (0, "{'n': 1}\n[2, 'two']\n{'n': 3, 'tags': ['a']}\n")
+    assert (tmp_path / "events.ndjson").read_text().endswith('[2, "two"]\n{"n": 3, "tags": ["a"]}\n')
+
+
+@pytest.mark.parametrize("source, message", [
+    ('let data be read json file "bad.json"\n', "Invalid JSON in 'bad.json'"),
+    ('for each r in ndjson file "bad.json":\n    print(r)\n', "Invalid JSON on line 2 of 'bad.json'"),
+    ('function f():\n    return 1\nwrite json [1, f] to file "out.json"\n', "Cannot write as JSON"),
+])
+def test_json_errors(run_ez, tmp_path, source, message):
+    (tmp_path / "bad.json").write_text('{"n": 1}\n{oops\n', encoding="utf-8")
+    status, output = run_ez(source)
+    assert status == 1
+    assert message in output
+
+
+CSV = 'name,age,score,member\nann,31,9.5,yes\n"bo, jr",7,6,false\n'
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_csv_rows_projection_and_types(run_ez, tmp_path, flags):
+    (tmp_path / "people.csv").write_text(CSV, encoding="utf-8")
+    status, output = run_ez(
+        'for each row in csv file "people.csv":\n'
+        "    print(row)\n"
+        'for each row in csv file "people.csv" with columns ["score", "name"]:\n'
+        "    print(row)\n"
+        'for each row in csv file "people.csv" with columns ["age"]:\n'
+        "    print(row)\n"
+        'for each row in csv file "people.csv" with columns {"age": int, "score": float, "member": bool}:\n'
+        "    print(row)\n",
+        *flags,
+    )
+    assert status == 0, output
+    assert output.splitlines() == [
+        "{'name': 'ann', 'age': '31', 'score': '9.5', 'member': 'yes'}",
+        "{'name': 'bo, jr', 'age': '7', 'score': '6', 'member': 'false'}",
+        "{'score': '9.5', 'name': 'ann'}",
+        "{'score': '6', 'name': 'bo, jr'}",
+        "{'age': '31'}",
+        "{'age': '7'}",
+        "{'age': 31, 'score': 9.5, 'member': True}",
+        "{'age': 7, 'score': 6.0, 'member': False}",
+    ]
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_csv_write_and_append(run_ez, tmp_path, flags):
+    status, output = run_ez(
+        'write csv [{"x": 1, "y": "a,b"}, {"x": 2, "y": "c"}] to file "out.csv"\n'
+        'append csv [3, "d"] to file "out.csv"\n'
+        'for each row in csv file "out.csv" with columns {"x": int}:\n'
+        '    print(row["x"])\n',
+        *flags,
+    )
+    assert (status, output) == (0, "1\n2\n3\n")
+    assert (tmp_path / "out.csv").read_text() == 'x,y\n1,"a,b"\n2,c\n3,d\n'
+
+
+@pytest.mark.parametrize("columns, message", [
+    ('["name", "height"]', "CSV file 'people.csv' has no column 'height'"),
+    ('{"name": int}', "CSV file 'people.csv' line 2, column 'name'"),
+    ('{"name": 5}', "each column type must be a function"),
+    ('"name"', "with columns expects a list of names or a dict of name: type"),
+])
+def test_csv_column_errors(run_ez, tmp_path, columns, message):
+    (tmp_path / "people.csv").write_text(CSV, encoding="utf-8")
+    status, output = run_ez(f'for each row in csv file "people.csv" with columns {columns}:\n    print(row)\n')
+    assert status == 1
+    assert message in output
@@ -0,0 +1,38 @@
+import pytest
+
+NESTED = (
+    "let v be 0\n"
+    "function outer(a):\n"
+    "    let v be 10\n"
+    "    function inner(b):\n"
+    '        print("v is {v}")\n'
+    "        return a + v + b\n"
+    "    return inner(5)\n"
+    "print(outer(1))\n"
+    "print(v)\n"
+)
+
+
+def test_nested_function_sees_enclosing_locals(run_ez):
+    status, output = run_ez(NESTED)
+    assert (status, output.split("\n")[:3]) == (0, ["v is 10", "16", "0"])
+
+
+RUNAWAY = (
+    "function down(n):\n"
+    "    if n == 0:\n"
+    "        return 0\n"
+    "    return 1 + down(n - 1)\n"
+    "print(down(500))\n"
+    "print(down(1000000))\n"
+)
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_runaway_recursion_is_a_script_error(run_ez, flags):
+    status, output = run_ez(RUNAWAY, *flags)
+    assert status == 1
+    assert output.startswith("500\n")
+    assert "EzScript Error on line 4" in output
+    assert "Too much recursion" in output
+    assert "Traceback" not in output
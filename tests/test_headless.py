@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+from conftest import INTERPRETER
+
+SCRIPT = """
+import os, runpy, sys
+sys.path.insert(0, os.path.dirname({interpreter!r}))
+sys.argv = [{interpreter!r}, "--headless", {script!r}]
+try:
+    runpy.run_path({interpreter!r}, run_name="__main__")
+finally:
+    print(sorted(m for m in ("PIL", "tkinter") if m in sys.modules))
+"""
+
+
+def test_pixel_buffers_do_not_load_pillow(tmp_path):
+    script = tmp_path / "pixels.ez"
+    script.write_text(
+        "let buf be createPixelBuffer(2, 2)\n"
+        'fillPixels(buf, "Navy")\n'
+        'setPixel(buf, 0, 0, "#102030")\n'
+        "setPixel(buf, 1, 1, (1, 2, 3))\n"
+        'print("drawn")\n',
+        encoding="utf-8",
+    )
+    code = SCRIPT.format(interpreter=str(INTERPRETER), script=str(script))
+    proc = subprocess.run([sys.executable, "-c", code], cwd=tmp_path,
+                          capture_output=True, text=True, timeout=60)
+    assert proc.stdout.split("\n")[:2] == ["drawn", "[]"], proc.stdout + proc.stderr
+
+
+def test_unknown_color_name_is_an_error(run_ez):
+    status, output = run_ez('setPixel(createPixelBuffer(1, 1), 0, 0, "lavenderblush")\n')
+    assert status == 1
+    assert "use \"#rrggbb\"" in output
@@ -0,0 +1,76 @@
+import pytest
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_memo_function_caches_results(run_ez, flags):
+    status, output = run_ez(
+        "memo function fib(n):\n"
+        "    if n < 2:\n"
+        "        return n\n"
+        "    return fib(n - 1) + fib(n - 2)\n"
+        "print(fib(200))\n"
+        "print(cacheInfo(fib))\n"
+        "cacheClear(fib)\n"
+        "print(cacheInfo(fib))\n"
+        "memo function loud(x):\n"
+        '    print("computing {x}")\n'
+        "    return x + 1\n"
+        "print(loud(1), loud(1), loud([1][0]))\n",
+        *flags,
+    )
+    assert status == 0, output
+    assert output.splitlines() == [
+        "280571172992510140037611932413038677189525",
+        "{'hits': 198, 'misses': 201, 'maxsize': 1024, 'size': 201}",
+        "{'hits': 0, 'misses': 0, 'maxsize': 1024, 'size': 0}",
+        "computing 1",
+        "2 2 2",
+    ]
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_memoize_evicts_least_recently_used(run_ez, flags):
+    status, output = run_ez(
+        "function slow(x, y = 1):\n"
+        '    print("run {x}")\n'
+        "    return x * y\n"
+        "let fast be memoize(slow, 2)\n"
+        "let results be [fast(3), fast(3), fast(4), fast(5), fast(3), fast(3, y = 2), fast([1])]\n"
+        "print(results)\n"
+        "print(cacheInfo(fast))\n",
+        *flags,
+    )
+    assert status == 0, output
+    # 3 is evicted by 4 and 5, y = 2 is another key, and lists are never cached
+    assert output.splitlines() == [
+        "run 3", "run 4", "run 5", "run 3", "run 3", "run [1]",
+        "[3, 3, 4, 5, 3, 6, [1]]",
+        "{'hits': 1, 'misses': 5, 'maxsize': 2, 'size': 2}",
+    ]
+
+
+def test_memo_errors_are_not_cached(run_ez):
+    status, output = run_ez(
+        "let calls be 0\n"
+        "memo function inverse(x):\n"
+        "    calls += 1\n"
+        "    return 1 / x\n"
+        "loop 2 times:\n"
+        "    try:\n"
+        "        inverse(0)\n"
+        "    catch e:\n"
+        '        print("error {e}")\n'
+        "print(calls, cacheInfo(inverse))\n"
+    )
+    assert (status, output.splitlines()[-1]) == (0, "2 {'hits': 0, 'misses': 2, 'maxsize': 1024, 'size': 0}")
+
+
+@pytest.mark.parametrize("source, message", [
+    ("function f():\n    return 1\nprint(cacheInfo(f))\n", "cacheInfo: <function f> is not a memo function"),
+    ("function f():\n    return 1\nlet g be memoize(f, 0)\n", "memoize: maxsize must be a positive whole number"),
+    ("let g be memoize(5)\n", "memoize: the first argument must be a function"),
+])
+def test_memo_argument_errors(run_ez, source, message):
+    status, output = run_ez(source)
+    assert status == 1
+    assert message in output
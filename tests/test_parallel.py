@@ -0,0 +1,23 @@
+def test_workers_read_what_the_script_wrote(run_ez):
+    status, output = run_ez(
+        'write "hello" to file "pw.txt"\n'
+        "parallel for each n in [1, 2] into out using 2 workers:\n"
+        '    let text be read file "pw.txt"\n'
+        "    return text\n"
+        "print(out)\n"
+    )
+    assert status == 0, output
+    assert output.strip() == "['hello', 'hello']"
+
+
+def test_unsendable_results_are_an_error(run_ez):
+    status, output = run_ez(
+        "function square(x):\n"
+        "    return x * x\n"
+        "parallel for each n in [1, 2] into out using 2 workers:\n"
+        "    return square\n"
+        "print(out)\n"
+    )
+    assert status == 1
+    assert "EzScript Error on line 3" in output
+    assert "must return plain values" in output
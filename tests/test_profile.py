@@ -0,0 +1,34 @@
+import json
+import threading
+
+SCRIPT = (
+    "function square(x):\n"
+    "    return x * x\n"
+    "let total be 0\n"
+    "loop 200 times:\n"
+    "    total += square(loop_index)\n"
+    "print(total)\n"
+)
+
+
+def test_profile_reports_lines_and_functions(run_ez, tmp_path):
+    status, output = run_ez(SCRIPT, "--profile", "--profile-output", str(tmp_path / "out"))
+    assert (status, output) == (0, "2646700\n")
+    report = json.loads((tmp_path / "out.profile.json").read_text())
+    assert [(f["name"], f["calls"]) for f in report["functions"]] == [("square", 200)]
+    assert {line["line"] for line in report["lines"]} == {1, 2, 3, 4, 5, 6}
+
+
+def test_profiler_only_times_its_own_interpreter(ez):
+    profiled, other = ez.EzInterpreter(), ez.EzInterpreter()
+    profiler = ez.Profiler()
+    ez.start_profiling(profiled, profiler)
+    try:
+        thread = threading.Thread(target=other.run_string, args=(SCRIPT.replace("print", "let shown be "),))
+        thread.start()
+        thread.join()
+    finally:
+        ez.stop_profiling(profiled)
+    assert other.variables["total"] == 2646700
+    assert (profiler.lines, profiler.functions) == ({}, {})
+    assert ez._profiling == 0
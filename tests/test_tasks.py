@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+GATHER = (
+    "function worker(n):\n"
+    "    wait 0.6 seconds\n"
+    "    return n * 10\n"
+    "let tasks be []\n"
+    "loop 5 times:\n"
+    "    tasks.append(spawn(worker, loop_index))\n"
+    "print(gather(tasks))\n"
+    "let t be spawn worker(7)\n"
+    "let r be await t\n"
+    "print(r)\n"
+)
+
+INTERLEAVED = (
+    "function noisy(name):\n"
+    "    loop 3 times:\n"
+    '        print("{name}{loop_index}")\n'
+    "        wait 0.4 seconds\n"
+    'spawn noisy("a")\n'
+    "wait 0.2 seconds\n"
+    'spawn noisy("b")\n'
+    'print("main")\n'
+)
+
+TASK_ERRORS = (
+    "function bad():\n"
+    "    wait 0.1 seconds\n"
+    "    let x be 1 / 0\n"
+    "let t be spawn bad()\n"
+    "try:\n"
+    "    await t\n"
+    "catch e:\n"
+    '    print("caught {e}")\n'
+    "spawn bad()\n"
+    'print("end")\n'
+)
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_gathered_tasks_wait_at_the_same_time(run_ez, flags):
+    started = time.monotonic()
+    status, output = run_ez(GATHER, *flags)
+    elapsed = time.monotonic() - started
+    assert (status, output) == (0, "[0, 10, 20, 30, 40]\n70\n")
+    # One after another the waits alone would take 3.6 seconds
+    assert elapsed < 2.5
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_tasks_take_turns_while_waiting(run_ez, flags):
+    status, output = run_ez(INTERLEAVED, *flags)
+    assert (status, output.split()) == (0, ["a0", "main", "b0", "a1", "b1", "a2", "b2"])
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_task_errors(run_ez, flags):
+    status, output = run_ez(TASK_ERRORS, *flags)
+    assert status == 1
+    # An awaited error can be caught; one nothing awaited is reported at the end
+    assert output.startswith("caught Cannot divide by zero\nend\n")
+    assert "EzScript Error on line 3" in output
+
+
+FAILING_MAIN = (
+    "function forever():\n"
+    "    while true:\n"
+    "        wait 0.05 seconds\n"
+    "function never():\n"
+    '    print("task ran")\n'
+    "let a be spawn(forever)\n"
+    "wait 0.2 seconds\n"
+    "let b be spawn(never)\n"
+    "print(1 / 0)\n"
+)
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_failed_script_does_not_wait_for_its_tasks(run_ez, flags):
+    status, output = run_ez(FAILING_MAIN, *flags, timeout=20)
+    assert status == 1
+    assert "EzScript Error on line 9" in output
+    assert "task ran" not in output
+
+
+def test_tasks_of_a_failed_script_stop(ez, capsys):
+    interpreter = ez.EzInterpreter()
+    with pytest.raises(ez.EzScriptError):
+        interpreter.run_string(FAILING_MAIN)
+    deadline = time.monotonic() + 5
+    while any(t.name.startswith("ezscript task") for t in threading.enumerate()):
+        assert time.monotonic() < deadline, "a task thread is still running"
+        time.sleep(0.05)
+    interpreter.run_string("function f(x):\n    return x + 1\nlet r be await spawn f(1)\nprint(r)\n")
+    assert capsys.readouterr().out == "2\n"
@@ -0,0 +1,20 @@
+import pytest
+
+FAILING_TIMER = (
+    'createWindow(100, 100, "timers")\n'
+    "function bad():\n"
+    "    let x be 1 / 0\n"
+    "every(1, bad)\n"
+    "loop 50 times:\n"
+    "    updateWindow()\n"
+    "    wait 0.01 seconds\n"
+    'print("finished without error")\n'
+)
+
+
+@pytest.mark.parametrize("flags", [(), ("--compile",)])
+def test_update_window_raises_timer_errors(run_ez, flags):
+    status, output = run_ez(FAILING_TIMER, "--backend", "pil", *flags, headless=False)
+    assert status == 1
+    assert "finished without error" not in output
+    assert "EzScript Error on line 3" in output